@@ -37,7 +37,7 @@ class DataIngestion:
         logger.info(f"Ingesting {len(data)} data points into domain: {domain}")
         
         try:
-            ingested_data = []
+            validated_items = []
             
             for item in data:
                 # Validate each data point
@@ -46,13 +46,10 @@ class DataIngestion:
                     logger.warning(f"Invalid data point: {item}")
                     continue
                 
-                # Insert the validated item into the knowledge graph
-                inserted_item = self._insert_into_kg(validated_item, domain, as_of_version)
-                if not inserted_item:
-                    logger.warning(f"Failed to insert data point: {validated_item}")
-                    continue
-                
-                ingested_data.append(inserted_item)
+                validated_items.append(validated_item)
+            
+            # Insert all validated items into the knowledge graph in one round-trip
+            ingested_data = self._insert_batch_into_kg(validated_items, domain, as_of_version)
             
             return {
                 "success": True,
@@ -91,54 +88,55 @@ class DataIngestion:
             logger.exception("An error occurred while validating data point")
             raise e
 
-    def _insert_into_kg(
+    def _insert_batch_into_kg(
         self,
-        validated_item: Dict[str, Any],
+        validated_items: List[Dict[str, Any]],
         domain: str,
         as_of_version: Optional[str] = None
-    ) -> Optional[Dict[str, Any]]:
+    ) -> List[Dict[str, Any]]:
         """
-        Insert a validated data point into the knowledge graph.
+        Insert validated data points into the knowledge graph with a single query.
         
         Args:
-            validated_item: The validated data point to insert
+            validated_items: The validated data points to insert
             domain: Domain to which the data belongs
             as_of_version: Optional version to associate with the ingested data
             
         Returns:
-            Inserted item or None if insertion failed
+            Inserted items
+            
+        Raises:
+            RuntimeError: If the insertion query fails
         """
+        if not validated_items:
+            return []
+        
         # Placeholder for insertion logic using ArangoDB
-        try:
-            aql_query = f"""
-            INSERT {{
-                "name": @name,
-                "description": @description,
-                "domain": @domain,
-                "metadata": @metadata,
-                "version": @version
-            }} INTO entities
+        # Errors propagate so ingest_data reports the batch as failed
+        aql_query = """
+        FOR d IN @docs
+            INSERT d INTO entities
             RETURN NEW
-            """
-            
-            bind_vars = {
-                "name": validated_item["name"],
-                "description": validated_item.get("description", ""),
+        """
+        
+        version = as_of_version or "v0.0.0"
+        docs = [
+            {
+                "name": item["name"],
+                "name_lc": item["name"].lower(),
+                "description": item.get("description", ""),
                 "domain": domain,
-                "metadata": validated_item.get("metadata", {}),
-                "version": as_of_version or "v0.0.0"
+                "metadata": item.get("metadata", {}),
+                "version": version
             }
-            
-            result = self.db_connection.execute_query(aql_query, bind_vars=bind_vars)
-            
-            if not result["success"]:
-                logger.error(f"Insertion failed: {result.get('error')}")
-                return None
-            
-            inserted_item = result["result"][0]
-            logger.info(f"Inserted item: {inserted_item}")
-            return inserted_item
+            for item in validated_items
+        ]
         
-        except Exception as e:
-            logger.exception("An error occurred while inserting into KG")
-            return None
\ No newline at end of file
+        result = self.db_connection.execute_query(aql_query, bind_vars={"docs": docs})
+        
+        if not result["success"]:
+            raise RuntimeError(f"Insertion failed: {result.get('error')}")
+        
+        inserted_items = result["result"]
+        logger.info(f"Inserted {len(inserted_items)} items into domain: {domain}")
+        return inserted_items
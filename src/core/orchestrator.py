@@ -2,8 +2,8 @@ from typing import Any, Dict, List, Optional
 import logging
 from src.rag.path_rag import PathRAG
 from src.tcr.restoration import TripleContextRestoration
-from src.graphcheck.verification import GraphCheck
-from src.ecl.learner import ExternalContinualLearner
+from src.graphcheck.verification import get_graphcheck
+from src.ecl.learner import get_ecl
 
 logger = logging.getLogger(__name__)
 
@@ -20,8 +20,8 @@ class HADESOrchestrator:
         logger.info("Initializing HADES orchestrator")
         self.path_rag = PathRAG()
         self.tcr = TripleContextRestoration()
-        self.graph_check = GraphCheck()
-        self.ecl = ExternalContinualLearner()
+        self.graph_check = get_graphcheck()
+        self.ecl = get_ecl()
 
     def process_query(
         self, 
@@ -7,8 +7,26 @@ import psycopg2.extras
 from typing import Any, Dict, List, Optional
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+# Set once the .env file has been read; a module flag rather than an
+# environment variable so child processes still load their own
+_ENV_LOADED = False
+
+
+def load_env(env_path: Optional[str] = None) -> None:
+    """
+    Load environment variables from the .env file, at most once per process.
+    
+    Args:
+        env_path: Path to the .env file (searched for from this module if not given)
+    """
+    global _ENV_LOADED
+    if _ENV_LOADED:
+        return
+    load_dotenv(env_path)
+    _ENV_LOADED = True
+
+
+load_env()
 
 logger = logging.getLogger(__name__)
 
@@ -134,7 +152,10 @@ class DBConnection:
         query: str,
         bind_vars: Optional[Dict[str, Any]] = None,
         as_of_version: Optional[str] = None,
-        as_of_timestamp: Optional[str] = None
+        as_of_timestamp: Optional[str] = None,
+        stream: bool = False,
+        batch_size: Optional[int] = None,
+        cache: Optional[bool] = None
     ) -> Dict[str, Any]:
         """
         Execute an AQL query on the ArangoDB database.
@@ -144,6 +165,13 @@ class DBConnection:
             bind_vars: Bind variables for the query (optional)
             as_of_version: Optional version to query against
             as_of_timestamp: Optional timestamp to query against
+            stream: Whether the server should stream results instead of
+                building the full result set up front; the result is then a
+                cursor that fetches batches as it is iterated
+            batch_size: Optional number of results fetched per round-trip
+            cache: Whether to serve the query from the AQL results cache;
+                only use for read-only queries. Left to the server's cache
+                mode when not given
             
         Returns:
             Query execution result and metadata
@@ -195,7 +223,23 @@ class DBConnection:
                     query_parts = query.split("FOR")
                     query = f"{query_parts[0]}FOR {version_clause} FOR{query_parts[1]}"
             
-            cursor = self.arango_db.aql.execute(query, bind_vars=bind_vars)
+            # Only send options the caller set, so server defaults still apply
+            options = {"stream": stream}
+            if batch_size is not None:
+                options["batch_size"] = batch_size
+            if cache is not None:
+                options["cache"] = cache
+            
+            cursor = self.arango_db.aql.execute(query, bind_vars=bind_vars, **options)
+            
+            # Hand streaming cursors back unread so memory stays bounded by one batch
+            if stream:
+                logger.info("AQL query executed successfully, streaming results")
+                return {
+                    "success": True,
+                    "result": cursor
+                }
+            
             results = [doc for doc in cursor]
             
             logger.info(f"AQL query executed successfully with {len(results)} results")
@@ -218,6 +262,61 @@ class DBConnection:
                 "error": str(e)
             }
     
+    def insert_change_logs(
+        self,
+        entries: List[Dict[str, Any]],
+        batch_size: int = 2000
+    ) -> Dict[str, Any]:
+        """
+        Insert change log entries into ArangoDB using the bulk import API.
+
+        Args:
+            entries: Change log entries to insert
+            batch_size: Number of entries sent per HTTP request
+
+        Returns:
+            Import result and metadata
+        """
+        if not self.arango_db:
+            logger.error("No ArangoDB connection available")
+            return {
+                "success": False,
+                "error": "Not connected to ArangoDB"
+            }
+
+        if not entries:
+            return {
+                "success": True,
+                "created": 0
+            }
+
+        try:
+            result = self.arango_db.collection("change_logs").import_bulk(
+                entries,
+                on_duplicate="error",
+                batch_size=batch_size,
+                sync=False
+            )
+
+            # python-arango returns a list of results when batching
+            results = result if isinstance(result, list) else [result]
+            created = sum(r.get("created", 0) for r in results)
+            errors = sum(r.get("errors", 0) for r in results)
+
+            logger.info(f"Imported {created} change log entries ({errors} errors)")
+            return {
+                "success": errors == 0,
+                "created": created,
+                "errors": errors
+            }
+
+        except ArangoError as e:
+            logger.error(f"Change log import failed: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
     def execute_postgres_query(
         self,
         query: str,
@@ -9,21 +9,34 @@ import argparse
 import os
 import sys
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import partial
 from typing import Dict, Any, Optional
 
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 from arango import ArangoClient
-from dotenv import load_dotenv
 
-from src.db.connection import DBConnection
+from src.db.connection import DBConnection, load_env
 from src.utils.logger import get_logger
 from src.utils.versioning import VersionMetadata
 from src.utils.config import config
 
 logger = get_logger(__name__)
 
+# Collections that carry version metadata
+VERSIONED_COLLECTIONS = ["entities", "relationships", "contexts", "domains"]
+
+# Persistent indexes backing fact verification lookups; the relationships
+# index is vertex-centric so traversals can filter outbound edges by version.
+# The domains index serves the continual learner's lookup by domain name.
+VERIFICATION_INDEXES = {
+    "entities": [["name_lc", "version"]],
+    "relationships": [["_from", "version"]],
+    "domains": [["name"]]
+}
+
 
 class DatabaseSetup:
     """Handles setup for all HADES databases."""
@@ -37,11 +50,10 @@ class DatabaseSetup:
         """
         self.force = force
         
-        # Load environment variables from .env file
+        # Load environment variables from .env file unless already loaded
         env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), '.env')
         if os.path.exists(env_path):
-            logger.info(f"Loading environment variables from {env_path}")
-            load_dotenv(env_path)
+            load_env(env_path)
         
         # PostgreSQL configuration
         self.pg_config = {
@@ -158,49 +170,78 @@ class DatabaseSetup:
         logger.info("Setting up ArangoDB database")
         
         try:
+            # Share one connection across all ArangoDB setup phases
+            db_connection = DBConnection()
+
             # Initialize ArangoDB using the DBConnection class
-            self.setup_arangodb_collections()
+            self.setup_arangodb_collections(db_connection)
             
             # Create change logs collection
-            self.create_change_logs_collection()
+            self.create_change_logs_collection(db_connection)
+            
+            # Create indexes used by fact verification
+            self.create_verification_indexes(db_connection)
+            
+            # Let queries that ask for it be served from the AQL results cache
+            self.configure_query_cache(db_connection)
             
             # Update existing documents with versioning
-            self.update_existing_documents_with_versioning()
+            self.update_existing_documents_with_versioning(db_connection)
             
             logger.info("ArangoDB setup completed successfully")
         except Exception as e:
             logger.error(f"ArangoDB setup failed: {e}")
             raise
 
-    def setup_arangodb_collections(self) -> None:
-        """Initialize the ArangoDB database with required collections and indexes."""
+    def setup_arangodb_collections(self, db_connection: Optional[DBConnection] = None) -> None:
+        """
+        Initialize the ArangoDB database with required collections and indexes.
+
+        Args:
+            db_connection: Optional connection to reuse (created if not provided)
+        """
         try:
             logger.info("Starting ArangoDB initialization")
-            db_connection = DBConnection()
+            db_connection = db_connection or DBConnection()
             db_connection.initialize_database()
             logger.info("ArangoDB initialization completed successfully")
         except Exception as e:
             logger.error(f"ArangoDB initialization failed: {e}")
             raise
 
-    def create_change_logs_collection(self) -> None:
-        """Set up the change_logs collection."""
+    def create_change_logs_collection(self, db_connection: Optional[DBConnection] = None) -> None:
+        """
+        Set up the change_logs collection.
+
+        Args:
+            db_connection: Optional connection to reuse (created if not provided)
+        """
         try:
             logger.info("Setting up change_logs collection")
 
             # Create a test entry to verify the collection is working
-            db_connection = DBConnection()
+            db_connection = db_connection or DBConnection()
             with db_connection.get_db() as db:
+                # Index timestamps so latest-change lookups (SORT timestamp DESC LIMIT 1)
+                # and cutoff filters are index range scans instead of full sorts
+                if db.has_collection("change_logs"):
+                    change_logs = db.collection("change_logs")
+                    change_logs.add_persistent_index(fields=["timestamp"])
+                    change_logs.add_persistent_index(fields=["entity_id", "timestamp"])
+
                 if db.has_collection("change_logs") and db.collection("change_logs").count() == 0:
                     logger.info("Adding test entry to change_logs")
 
+                    # Format the timestamp once for every seeded entry
+                    timestamp = datetime.now(timezone.utc).isoformat()
+
                     test_entry = {
                         "_key": str(uuid.uuid4()),
                         "entity_id": "test/entity",
                         "previous_version": None,
                         "new_version": "v0.1.0",
                         "commit_id": str(uuid.uuid4()),
-                        "timestamp": datetime.now(timezone.utc).isoformat(),
+                        "timestamp": timestamp,
                         "changes": {
                             "added": {"name": "Test Entity"},
                             "removed": {},
@@ -209,53 +250,131 @@ class DatabaseSetup:
                         "commit_message": "Initial test entry for change_logs"
                     }
 
-                    db.collection("change_logs").insert(test_entry)
+                    result = db_connection.insert_change_logs([test_entry])
+                    if not result["success"]:
+                        raise RuntimeError(f"Change log import failed: {result.get('error', result)}")
                     logger.info("Test entry added to change_logs")
         except Exception as e:
             logger.error(f"Failed to set up change_logs collection: {e}")
             raise
 
-    def update_existing_documents_with_versioning(self) -> None:
-        """Add versioning metadata to existing documents if they don't have it."""
+    def create_verification_indexes(self, db_connection: Optional[DBConnection] = None) -> None:
+        """
+        Create the persistent indexes used by fact verification queries.
+
+        Args:
+            db_connection: Optional connection to reuse (created if not provided)
+        """
+        try:
+            logger.info("Creating fact verification indexes")
+
+            db_connection = db_connection or DBConnection()
+            with db_connection.get_db() as db:
+                for collection_name, index_fields in VERIFICATION_INDEXES.items():
+                    if not db.has_collection(collection_name):
+                        continue
+
+                    # Claims are matched on lowercased entity names
+                    if collection_name == "entities":
+                        db.aql.execute("""
+                        FOR e IN entities
+                            FILTER e.name_lc == null AND e.name != null
+                            UPDATE e WITH { name_lc: LOWER(e.name) } IN entities
+                        """)
+
+                    collection = db.collection(collection_name)
+                    for fields in index_fields:
+                        # Existing indexes with the same fields are returned unchanged
+                        collection.add_persistent_index(fields=fields)
+                        logger.info(f"Ensured persistent index on {collection_name}({', '.join(fields)})")
+        except Exception as e:
+            logger.error(f"Failed to create fact verification indexes: {e}")
+            raise
+
+    def configure_query_cache(self, db_connection: Optional[DBConnection] = None) -> None:
+        """
+        Enable the AQL results cache in on-demand mode.
+
+        Queries opt in with cache=True (claim verification, domain lookups);
+        everything else bypasses the cache. The mode is a server-wide setting
+        that needs admin rights; those queries work without the cache, so a
+        failure here is logged and setup continues.
+
+        Args:
+            db_connection: Optional connection to reuse (created if not provided)
+        """
+        try:
+            logger.info("Configuring AQL query results cache")
+
+            db_connection = db_connection or DBConnection()
+            with db_connection.get_db() as db:
+                db.aql.cache.configure(mode="demand")
+        except Exception as e:
+            logger.warning(f"Could not configure AQL query results cache, continuing without it: {e}")
+
+    def update_existing_documents_with_versioning(self, db_connection: Optional[DBConnection] = None) -> None:
+        """
+        Add versioning metadata to existing documents if they don't have it.
+
+        Args:
+            db_connection: Optional connection to reuse (created if not provided)
+        """
         try:
             logger.info("Updating existing documents with version metadata")
 
-            db_connection = DBConnection()
+            # Every backfilled document gets the same initial version metadata
+            version_meta = VersionMetadata.create_metadata("v0.1.0")
+
+            db_connection = db_connection or DBConnection()
             with db_connection.get_db() as db:
-                # Process collections
-                for collection in ["entities", "relationships", "contexts", "domains"]:
-                    if db.has_collection(collection):
-                        logger.info(f"Processing {collection} collection")
-
-                        # Get all documents without version metadata
-                        query = f"""
-                        FOR doc IN {collection}
-                            FILTER doc.version == null
-                            RETURN doc
-                        """
-
-                        cursor = db.aql.execute(query)
-                        docs_to_update = list(cursor)
-
-                        if docs_to_update:
-                            logger.info(f"Adding version metadata to {len(docs_to_update)} documents in {collection}")
-
-                            # Update each document with version metadata
-                            for doc in docs_to_update:
-                                # Create version metadata
-                                version_meta = VersionMetadata.create_metadata("v0.1.0")
-
-                                # Update the document
-                                db.collection(collection).update(
-                                    doc["_key"],
-                                    version_meta
-                                )
-                        else:
-                            logger.info(f"No documents in {collection} need version metadata")
+                # Collections are independent, so overlap their round-trips
+                backfill = partial(self._backfill_versions, db, version_meta=version_meta)
+                with ThreadPoolExecutor(max_workers=len(VERSIONED_COLLECTIONS)) as executor:
+                    list(executor.map(backfill, VERSIONED_COLLECTIONS))
         except Exception as e:
             logger.error(f"Failed to update existing documents with versioning: {e}")
             raise
 
+    def _backfill_versions(self, db: Any, collection: str, version_meta: Dict[str, Any]) -> int:
+        """
+        Add version metadata to unversioned documents in a single collection.
+
+        Args:
+            db: ArangoDB database handle
+            collection: Name of the collection to backfill
+            version_meta: Version metadata to apply
+
+        Returns:
+            Number of documents updated
+        """
+        if not db.has_collection(collection):
+            return 0
+
+        logger.info(f"Processing {collection} collection")
+
+        # Add version metadata to every unversioned document server-side
+        query = """
+        LET updated = (
+            FOR doc IN @@collection
+                FILTER doc.version == null
+                UPDATE doc WITH @version_meta IN @@collection
+                RETURN 1
+        )
+        RETURN LENGTH(updated)
+        """
+
+        cursor = db.aql.execute(
+            query,
+            bind_vars={"@collection": collection, "version_meta": version_meta}
+        )
+        updated_count = next(cursor, 0)
+
+        if updated_count:
+            logger.info(f"Added version metadata to {updated_count} documents in {collection}")
+        else:
+            logger.info(f"No documents in {collection} need version metadata")
+
+        return updated_count
 
 def main() -> None:
     """Main entry point for database setup."""
@@ -1,10 +1,48 @@
+import asyncio
 import logging
+import re
 import numpy as np
-from typing import List, Dict, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Dict, Any, Optional, Set, Tuple
 from datetime import datetime
+from arango.exceptions import DocumentUpdateError
 from ..db.connection import get_db_connection
+from ..utils.embeddings import encode_embedding_blob
 from ..utils.versioning import KGVersion, ChangeLog
 
+# Typical embedding size for BERT-large
+EMBEDDING_DIM = 768
+
+# Placeholder domain embedding used until a real encoder is wired in; read-only
+# because every caller shares the same array
+_STUB_EMBEDDING = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+_STUB_EMBEDDING.flags.writeable = False
+
+# Upper bound on concurrent domain embedding refreshes
+MAX_DOMAIN_WORKERS = 8
+
+# Characters not allowed in an ArangoDB document key
+_INVALID_KEY_CHARS = re.compile(r"[^A-Za-z0-9_\-:.@()+,=;$!*'%]")
+
+
+def domain_key(domain_name: str) -> str:
+    """
+    Normalize a domain name into the preferred document key in the domains collection.
+    
+    Domains stored under this key are fetched by primary key; others are found
+    by name. The mapping is lossy ("a/b" and "a_b" share a key), so a key hit
+    only counts if the stored name matches.
+    
+    Args:
+        domain_name: Name of the domain
+        
+    Returns:
+        Valid ArangoDB document key for the domain
+    """
+    return _INVALID_KEY_CHARS.sub("_", domain_name.strip())
+
+
 class ExternalContinualLearner:
     """
     External Continual Learner implementation for maintaining domain embeddings
@@ -16,12 +54,13 @@ class ExternalContinualLearner:
         self.db = db_connection or get_db_connection()
         self.change_log = ChangeLog(self.db)
     
-    def maintain_domain_embeddings(self, domain_name: str) -> Dict[str, Any]:
+    def maintain_domain_embeddings(self, domain_name: str, timestamp: Optional[str] = None) -> Dict[str, Any]:
         """
         Update and maintain domain embeddings.
         
         Args:
             domain_name: Name of the domain to update
+            timestamp: Optional ISO timestamp shared by a batch of updates
             
         Returns:
             Updated domain metadata
@@ -31,16 +70,44 @@ class ExternalContinualLearner:
         # Get domain data
         domain = self._get_domain(domain_name)
         
+        return self._refresh_domain_embeddings(domain, timestamp=timestamp)
+    
+    def _refresh_domain_embeddings(self, domain: Dict[str, Any], timestamp: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Recalculate and store embeddings for an already loaded domain.
+        
+        Args:
+            domain: Domain data including entities
+            timestamp: Optional ISO timestamp shared by a batch of updates
+            
+        Returns:
+            Updated domain metadata
+        """
+        domain_name = domain["name"]
+        
+        # Nothing to embed, so skip the computation and the database write
+        if not domain.get("entities"):
+            self.logger.info(f"Skipping embedding refresh for empty domain {domain_name}")
+            return {"domain": domain_name, "embedding_size": 0, "skipped": True}
+        
+        timestamp = timestamp or datetime.now().isoformat()
+        
         # Update domain embeddings
         embeddings = self._calculate_domain_embeddings(domain)
         
-        # Store updated embeddings
-        self._store_domain_embeddings(domain_name, embeddings)
+        # Store updated embeddings under the document's own key; older domains
+        # were not necessarily created with domain_key(name)
+        self._store_domain_embeddings(
+            domain_name,
+            embeddings,
+            timestamp=timestamp,
+            key=domain.get("_key")
+        )
         
         return {
             "domain": domain_name,
             "embedding_size": len(embeddings),
-            "updated_at": datetime.now().isoformat()
+            "updated_at": timestamp
         }
     
     def process_incremental_updates(self, start_version: str, end_version: str) -> Dict[str, Any]:
@@ -63,20 +130,25 @@ class ExternalContinualLearner:
         # Get changes between versions
         changes = self.change_log.get_changes_between_versions(start_v, end_v)
         
-        # Count changes by type
-        added_entities = [c for c in changes if c["change_type"] == "added" and c["collection"] == "entities"]
-        updated_entities = [c for c in changes if c["change_type"] == "updated" and c["collection"] == "entities"]
-        added_relationships = [c for c in changes if c["change_type"] == "added" and c["collection"] == "relationships"]
+        # Bucket changes by type in a single pass
+        buckets = self._categorize_changes(changes)
+        added_entities = buckets["added_entities"]
+        updated_entities = buckets["updated_entities"]
+        added_relationships = buckets["added_relationships"]
         
         # Process each type of change
         self._process_added_entities(added_entities)
         self._process_updated_entities(updated_entities)
         self._process_added_relationships(added_relationships)
         
-        # Update affected domains
-        affected_domains = self._identify_affected_domains(changes)
-        for domain_name in affected_domains:
-            self.maintain_domain_embeddings(domain_name)
+        # Load affected domains with their entities, then overlap the writes
+        domains = self._identify_affected_domains(buckets["entity_ids"])
+        if domains:
+            # All domains refreshed by this batch share one timestamp
+            refresh = partial(self._refresh_domain_embeddings, timestamp=datetime.now().isoformat())
+            max_workers = min(MAX_DOMAIN_WORKERS, len(domains))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(refresh, domains))
         
         return {
             "start_version": start_version,
@@ -85,7 +157,7 @@ class ExternalContinualLearner:
             "added_entities": len(added_entities),
             "updated_entities": len(updated_entities),
             "added_relationships": len(added_relationships),
-            "affected_domains": affected_domains
+            "affected_domains": [domain["name"] for domain in domains]
         }
     
     def generate_training_data(self, start_version: str, end_version: str) -> List[Dict[str, Any]]:
@@ -137,36 +209,39 @@ class ExternalContinualLearner:
         """
         Get domain data from the database.
         
+        The domain is first looked up by its normalized key (see domain_key).
+        Domains created under other keys, or whose key collides with another
+        name, fall back to the persistent index on domains.name.
+        
         Args:
             domain_name: Name of the domain
             
         Returns:
-            Domain data
+            Domain data including its entities
         """
+        # Fetch the domain and its entities in a single round-trip
         query = """
-        FOR d IN domains
-            FILTER d.name == @domain_name
-            RETURN d
-        """
-        cursor = self.db.aql.execute(query, bind_vars={"domain_name": domain_name})
-        domains = [doc for doc in cursor]
-        
-        if not domains:
-            self.logger.warning(f"Domain not found: {domain_name}")
-            return {"name": domain_name, "entities": []}
-        
-        # Get entities in the domain
-        entity_query = """
-        FOR d IN domains
-            FILTER d.name == @domain_name
+        LET by_key = DOCUMENT("domains", @domain_key)
+        LET d = by_key != null AND by_key.name == @name
+            ? by_key
+            : FIRST(FOR x IN domains FILTER x.name == @name LIMIT 1 RETURN x)
+        FILTER d != null
+        LET entities = (
             FOR e IN OUTBOUND d entity_domains
                 RETURN e
+        )
+        RETURN MERGE(d, { entities: entities })
         """
-        cursor = self.db.aql.execute(entity_query, bind_vars={"domain_name": domain_name})
-        entities = [doc for doc in cursor]
-        
-        domain = domains[0]
-        domain["entities"] = entities
+        cursor = self.db.aql.execute(
+            query,
+            bind_vars={"domain_key": domain_key(domain_name), "name": domain_name},
+            cache=True
+        )
+        domain = next(cursor, None)
+        
+        if domain is None:
+            self.logger.warning(f"Domain not found: {domain_name}")
+            return {"name": domain_name, "entities": []}
         
         return domain
     
@@ -181,38 +256,50 @@ class ExternalContinualLearner:
             Domain embeddings
         """
         # In a real implementation, this would use ModernBERT-large or similar
-        # For demonstration, creating a random embedding
-        embedding_dim = 768  # Typical for BERT-large
-        
-        # Create a mock embedding
-        embedding = np.random.randn(embedding_dim)
-        embedding = embedding / np.linalg.norm(embedding)  # Normalize
-        
-        return embedding
+        # For demonstration, returning a shared placeholder embedding
+        return _STUB_EMBEDDING
     
-    def _store_domain_embeddings(self, domain_name: str, embeddings: np.ndarray) -> None:
+    def _store_domain_embeddings(
+        self,
+        domain_name: str,
+        embeddings: np.ndarray,
+        timestamp: Optional[str] = None,
+        key: Optional[str] = None
+    ) -> None:
         """
         Store domain embeddings in the database.
         
+        Embeddings use the shared float16 blob format (see
+        src.utils.embeddings.encode_embedding_blob) rather than a JSON float array.
+        
         Args:
             domain_name: Name of the domain
             embeddings: Domain embeddings
+            timestamp: Optional ISO timestamp (defaults to now)
+            key: Document key of the domain (defaults to domain_key(domain_name))
         """
-        # Convert numpy array to list for storage
-        embedding_list = embeddings.tolist()
-        
-        # Store embeddings
-        query = """
-        FOR d IN domains
-            FILTER d.name == @domain_name
-            UPDATE d WITH { embeddings: @embeddings, updated_at: @timestamp } IN domains
-            RETURN NEW
-        """
-        self.db.aql.execute(query, bind_vars={
-            "domain_name": domain_name,
-            "embeddings": embedding_list,
-            "timestamp": datetime.now().isoformat()
-        })
+        # Store embeddings by primary key, dropping the legacy float-array and
+        # float32 blob fields
+        try:
+            self.db.collection("domains").update(
+                {
+                    "_key": key or domain_key(domain_name),
+                    "embeddings": None,
+                    "embeddings_b64": None,
+                    "embedding_dim": int(embeddings.shape[0]),
+                    "embedding_dtype": "fp16",
+                    "embedding_blob": encode_embedding_blob(embeddings),
+                    "updated_at": timestamp or datetime.now().isoformat()
+                },
+                keep_none=False,
+                silent=True
+            )
+        except DocumentUpdateError as e:
+            # A missing domain is skipped, as the previous UPDATE query did
+            if e.http_code != 404:
+                raise
+            self.logger.warning(f"Domain not found when storing embeddings: {domain_name}")
+            return
         
         self.logger.info(f"Stored embeddings for domain: {domain_name}")
     
@@ -261,41 +348,117 @@ class ExternalContinualLearner:
             # For demonstration, logging only
             self.logger.info(f"Added relationship processed: {relationship_id}")
     
-    def _identify_affected_domains(self, changes: List[Dict[str, Any]]) -> List[str]:
+    def _categorize_changes(self, changes: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
-        Identify domains affected by changes.
+        Bucket changes by type and collect the entity IDs they touch.
         
         Args:
             changes: List of changes
             
         Returns:
-            List of affected domain names
+            Dictionary with added/updated entity changes, added relationship
+            changes and the set of affected entity IDs
         """
-        affected_domains = set()
+        buckets = {
+            "added_entities": [],
+            "updated_entities": [],
+            "added_relationships": [],
+            "entity_ids": set()
+        }
         
-        # Get entity IDs from changes
-        entity_ids = []
         for change in changes:
-            if change["collection"] == "entities":
-                entity_ids.append(change["document_id"])
-            elif change["collection"] == "relationships":
+            collection = change["collection"]
+            change_type = change["change_type"]
+            
+            if collection == "entities":
+                buckets["entity_ids"].add(change["document_id"])
+                if change_type == "added":
+                    buckets["added_entities"].append(change)
+                elif change_type == "updated":
+                    buckets["updated_entities"].append(change)
+            elif collection == "relationships":
+                if change_type == "added":
+                    buckets["added_relationships"].append(change)
+                
                 # For relationships, need to get the connected entities
-                rel_data = change.get("new_value", {})
+                rel_data = change.get("new_value") or {}
                 if "_from" in rel_data:
-                    entity_ids.append(rel_data["_from"])
+                    buckets["entity_ids"].add(rel_data["_from"])
                 if "_to" in rel_data:
-                    entity_ids.append(rel_data["_to"])
+                    buckets["entity_ids"].add(rel_data["_to"])
         
-        # Find domains containing these entities
-        if entity_ids:
-            query = """
+        return buckets
+    
+    def _identify_affected_domains(self, entity_ids: Set[str]) -> List[Dict[str, Any]]:
+        """
+        Identify domains affected by changes.
+        
+        Each affected domain is returned with all of its entities, so callers
+        can recalculate embeddings without fetching the domain again.
+        
+        Args:
+            entity_ids: IDs of entities touched by the changes
+            
+        Returns:
+            List of affected domains including their entities
+        """
+        if not entity_ids:
+            return []
+        
+        # Resolve affected domains and load their entities in one query
+        query = """
+        LET domain_ids = UNIQUE(
             FOR e IN entities
                 FILTER e._id IN @entity_ids
                 FOR d IN INBOUND e entity_domains
-                    RETURN DISTINCT d.name
-            """
-            cursor = self.db.aql.execute(query, bind_vars={"entity_ids": entity_ids})
-            domains = [doc for doc in cursor]
-            affected_domains.update(domains)
+                    RETURN d._id
+        )
+        FOR d IN domains
+            FILTER d._id IN domain_ids
+            LET entities = (
+                FOR e IN OUTBOUND d entity_domains
+                    RETURN e
+            )
+            RETURN MERGE(d, { entities: entities })
+        """
+        cursor = self.db.aql.execute(query, bind_vars={"entity_ids": list(entity_ids)}, cache=True)
+        return [doc for doc in cursor]
+
+
+class AsyncExternalContinualLearner:
+    """
+    Asyncio front-end for ExternalContinualLearner.
+    
+    python-arango is synchronous, so each call runs the shared synchronous
+    implementation in a worker thread via asyncio.to_thread, keeping the
+    event loop free while the learner waits on the database.
+    """
+    
+    def __init__(self, learner: Optional[ExternalContinualLearner] = None, db_connection=None):
+        self.learner = learner or ExternalContinualLearner(db_connection)
+    
+    async def maintain_domain_embeddings(self, domain_name: str, timestamp: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Update and maintain domain embeddings.
         
-        return list(affected_domains) 
\ No newline at end of file
+        Args:
+            domain_name: Name of the domain to update
+            timestamp: Optional ISO timestamp shared by a batch of updates
+            
+        Returns:
+            Updated domain metadata
+        """
+        return await asyncio.to_thread(self.learner.maintain_domain_embeddings, domain_name, timestamp)
+    
+    async def process_incremental_updates(self, start_version: str, end_version: str) -> Dict[str, Any]:
+        """
+        Process incremental updates based on version diffs.
+        
+        Args:
+            start_version: Starting version string
+            end_version: Ending version string
+            
+        Returns:
+            Summary of updates processed
+        """
+        return await asyncio.to_thread(self.learner.process_incremental_updates, start_version, end_version)
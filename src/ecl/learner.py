@@ -1,8 +1,11 @@
 from typing import Any, Dict, List, Optional
 import logging
+import numpy as np
 from transformers import BertTokenizer, BertModel
 import torch
 
+from src.utils.embeddings import EmbeddingCache, encode_embedding_blob, mean_pool
+
 logger = logging.getLogger(__name__)
 
 class ExternalContinualLearner:
@@ -15,13 +18,48 @@ class ExternalContinualLearner:
     def __init__(self):
         """Initialize the ECL module."""
         logger.info("Initializing ExternalContinualLearner module")
-        self.tokenizer = BertTokenizer.from_pretrained('bert-base-uncased')
-        self.model = BertModel.from_pretrained('bert-base-uncased')
+        
+        # BERT is loaded on first use so importing or constructing the learner stays cheap
+        self._tokenizer = None
+        self._model = None
+        
+        # Embeddings of recently seen document texts
+        self._embedding_cache = EmbeddingCache()
+
+    def _ensure_model(self) -> None:
+        """Load the tokenizer and model if they have not been loaded yet."""
+        if self._model is not None:
+            return
+        
+        logger.info("Loading BERT tokenizer and model")
+        self._tokenizer = BertTokenizer.from_pretrained('bert-base-uncased')
+        model = BertModel.from_pretrained('bert-base-uncased')
+        
+        # Inference only: disable dropout and run in half precision
+        model.eval()
+        if torch.cuda.is_available():
+            model = model.half().cuda()
+        else:
+            model = model.to(torch.bfloat16)
+        self._model = model
+
+    @property
+    def tokenizer(self) -> BertTokenizer:
+        """BERT tokenizer, loaded on first access."""
+        self._ensure_model()
+        return self._tokenizer
+
+    @property
+    def model(self) -> BertModel:
+        """BERT model, loaded on first access."""
+        self._ensure_model()
+        return self._model
 
     def update_embeddings(
         self,
         domain: str,
-        documents: List[Dict[str, Any]]
+        documents: List[Dict[str, Any]],
+        batch_size: int = 32
     ) -> Dict[str, Any]:
         """
         Update embeddings for a specific domain.
@@ -29,6 +67,7 @@ class ExternalContinualLearner:
         Args:
             domain: The domain to update embeddings for
             documents: List of documents to process and update embeddings with
+            batch_size: Number of documents encoded per forward pass
             
         Returns:
             Embedding update status and metadata
@@ -39,14 +78,34 @@ class ExternalContinualLearner:
         try:
             updated_embeddings = []
             
+            # Skip documents without text up front so batches only hold real inputs
+            docs_with_text = []
             for doc in documents:
-                # Process each document and generate embeddings
-                embedding = self._generate_embedding(doc)
-                if not embedding:
-                    logger.warning(f"Failed to generate embedding for document: {doc.get('id')}")
+                if not doc.get("text"):
+                    logger.warning(f"No text found in document: {doc.get('id')}")
                     continue
-                
-                updated_embeddings.append(embedding)
+                docs_with_text.append(doc)
+            
+            # Encode documents in fixed-size batches to bound memory use
+            batches = [
+                docs_with_text[start:start + batch_size]
+                for start in range(0, len(docs_with_text), batch_size)
+            ]
+            
+            # Batches run one at a time; torch already spreads each forward
+            # pass over its intra-op thread pool
+            batch_vectors = [self._generate_embeddings_batch(batch) for batch in batches]
+            
+            for batch, vectors in zip(batches, batch_vectors):
+                for doc, vector in zip(batch, vectors):
+                    updated_embeddings.append({
+                        "document_id": doc.get("id"),
+                        "embedding_dim": int(vector.shape[0]),
+                        "embedding_dtype": "fp16",
+                        "embedding_blob": encode_embedding_blob(vector)
+                    })
+            
+            logger.info(f"Generated {len(updated_embeddings)} embeddings for domain: {domain}")
             
             return {
                 "success": True,
@@ -61,38 +120,59 @@ class ExternalContinualLearner:
                 "error": str(e)
             }
 
-    def _generate_embedding(self, document: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def _generate_embeddings_batch(self, documents: List[Dict[str, Any]]) -> np.ndarray:
         """
-        Generate an embedding for a single document.
+        Generate embeddings for a batch of documents, reusing cached results.
         
         Args:
-            document: The document to generate an embedding for
+            documents: Documents to generate embeddings for; each must have text
             
         Returns:
-            Generated embedding
+            Array of shape (len(documents), hidden_size) with one embedding per document
         """
-        # Placeholder for embedding generation logic using ModernBERT-large
-        try:
-            text = document.get("text")
-            if not text:
-                logger.warning(f"No text found in document: {document.get('id')}")
-                return None
-            
-            inputs = self.tokenizer(text, return_tensors="pt", truncation=True, padding=True)
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-            
-            # Use the mean of token embeddings as the document embedding
-            embedding_vector = outputs.last_hidden_state.mean(dim=1).squeeze().tolist()
-            
-            embedding = {
-                "document_id": document.get("id"),
-                "embedding_vector": embedding_vector
-            }
+        vectors = self._embedding_cache.get_or_encode(
+            [doc["text"] for doc in documents], self._encode_texts
+        )
+        return torch.stack(vectors).numpy()
+
+    def _encode_texts(self, texts: List[str]) -> torch.Tensor:
+        """
+        Encode texts through BERT in a single forward pass.
+        
+        Args:
+            texts: Texts to encode
             
-            logger.info(f"Generated embedding for document: {document.get('id')}")
-            return embedding
+        Returns:
+            Float32 tensor of shape (len(texts), hidden_size) with one embedding per text
+        """
+        inputs = self.tokenizer(
+            texts,
+            return_tensors="pt",
+            truncation=True,
+            padding=True,
+            max_length=512
+        ).to(self.model.device)
         
-        except Exception as e:
-            logger.exception("An error occurred while generating an embedding")
-            return None
+        with torch.inference_mode():
+            hidden = self.model(**inputs).last_hidden_state
+        
+        embeddings = mean_pool(hidden, inputs["attention_mask"])
+        
+        # Cast back to fp32 so downstream consumers see full-precision vectors
+        return embeddings.float().cpu()
+
+# Shared learner, created by get_ecl() the first time it is needed
+_ecl: Optional[ExternalContinualLearner] = None
+
+
+def get_ecl() -> ExternalContinualLearner:
+    """
+    Get the shared ExternalContinualLearner instance, creating it on first use.
+    
+    Returns:
+        The shared ExternalContinualLearner instance
+    """
+    global _ecl
+    if _ecl is None:
+        _ecl = ExternalContinualLearner()
+    return _ecl
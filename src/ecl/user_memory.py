@@ -1,9 +1,42 @@
+import atexit
+import functools
+import grp
 import os
 import hashlib
-import json
+import pwd
+import shutil
 import time
+import weakref
+from collections import OrderedDict
 from pathlib import Path
 
+import orjson
+
+# Per-conversation message counter, stored as a fixed-width little-endian int
+MESSAGE_COUNT_FILE = "message_count.bin"
+COUNTER_BYTES = 8
+
+# Maximum number of conversation message files kept open at once
+MAX_OPEN_CONVERSATIONS = 128
+
+
+# Managers with files to flush at exit; weak references let unused managers be collected
+_open_managers = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_managers():
+    """Close the conversation files of every manager still alive at exit"""
+    for manager in list(_open_managers):
+        manager.close()
+
+
+@functools.lru_cache(maxsize=4096)
+def _api_key_digest(api_key):
+    """Hash an API key into a 16 hex character directory name"""
+    return hashlib.blake2b(api_key.encode('utf-8'), digest_size=8).hexdigest()
+
+
 class UserMemoryManager:
     def __init__(self, base_directory="/home/hades/.hades"):
         self.base_directory = Path(base_directory)
@@ -14,12 +47,39 @@ class UserMemoryManager:
         os.makedirs(self.users_directory, exist_ok=True)
         os.makedirs(self.system_directory, exist_ok=True)
         
+        # Open messages.jsonl writers, most recently used last
+        self._message_writers = OrderedDict()
+        _open_managers.add(self)
+        
         # Monitor system files
         self._setup_system_monitoring()
     
+    def close(self):
+        """Close any conversation files held open by this manager"""
+        while self._message_writers:
+            _, writer = self._message_writers.popitem(last=False)
+            writer.close()
+    
+    def _message_writer(self, messages_file):
+        """Get an open append handle for a conversation's messages file"""
+        writer = self._message_writers.get(messages_file)
+        if writer is not None:
+            self._message_writers.move_to_end(messages_file)
+            return writer
+        
+        writer = open(messages_file, 'ab', buffering=64 * 1024)
+        self._message_writers[messages_file] = writer
+        
+        # Bound the number of open file descriptors
+        if len(self._message_writers) > MAX_OPEN_CONVERSATIONS:
+            _, oldest = self._message_writers.popitem(last=False)
+            oldest.close()
+        
+        return writer
+    
     def _hash_api_key(self, api_key):
         """Create a hash of API key for directory naming"""
-        return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+        return _api_key_digest(api_key)
     
     def _setup_system_monitoring(self):
         """Set up monitoring for system files like /etc/passwd and /etc/group"""
@@ -41,39 +101,53 @@ class UserMemoryManager:
     def _capture_system_file(self, source_path, target_path):
         """Copy system file to monitored location"""
         try:
-            with open(source_path, 'r') as source:
-                with open(target_path, 'w') as target:
-                    target.write(source.read())
+            # copyfile lets the kernel copy the data without a userspace buffer
+            shutil.copyfile(source_path, target_path)
             return True
         except Exception as e:
             print(f"Error capturing {source_path}: {e}")
             return False
     
+    def _metadata_is_current(self, metadata_path, source_path):
+        """Check whether metadata was generated from the current version of a system file"""
+        try:
+            with open(metadata_path, 'rb') as f:
+                metadata = orjson.loads(f.read())
+            return metadata.get("source_mtime") == os.stat(source_path).st_mtime
+        except (OSError, ValueError):
+            return False
+    
     def _create_permissions_metadata(self, passwd_dir):
-        """Create metadata about user permissions from passwd file"""
+        """Create metadata about user permissions from the passwd database"""
         metadata_path = passwd_dir / "metadata" / "permissions.json"
         os.makedirs(os.path.dirname(metadata_path), exist_ok=True)
         
-        # Parse passwd file and extract user info
-        passwd_info = {}
+        # Skip regeneration if /etc/passwd has not changed since the last run
+        if self._metadata_is_current(metadata_path, "/etc/passwd"):
+            return
+        
         try:
-            with open(passwd_dir / "raw" / "etc_passwd.txt", 'r') as f:
-                for line in f:
-                    if line.strip() and not line.startswith('#'):
-                        parts = line.strip().split(':')
-                        if len(parts) >= 7:
-                            username, _, uid, gid, comment, home, shell = parts
-                            passwd_info[username] = {
-                                "uid": uid,
-                                "gid": gid,
-                                "comment": comment,
-                                "home": home,
-                                "shell": shell
-                            }
+            source_mtime = os.stat("/etc/passwd").st_mtime
+            
+            # Read user info through the C-level passwd API instead of parsing lines
+            passwd_info = {
+                p.pw_name: {
+                    "uid": str(p.pw_uid),
+                    "gid": str(p.pw_gid),
+                    "comment": p.pw_gecos,
+                    "home": p.pw_dir,
+                    "shell": p.pw_shell
+                }
+                for p in pwd.getpwall()
+            }
             
             # Write metadata
-            with open(metadata_path, 'w') as f:
-                json.dump({"users": passwd_info, "timestamp": time.time()}, f, indent=2)
+            with open(metadata_path, 'wb') as f:
+                f.write(orjson.dumps({
+                    "users": passwd_info,
+                    "timestamp": time.time(),
+                    "source_mtime": source_mtime
+                }, option=orjson.OPT_INDENT_2))
                 
         except Exception as e:
             print(f"Error creating permissions metadata: {e}")
@@ -83,24 +157,29 @@ class UserMemoryManager:
         metadata_path = group_dir / "metadata" / "relationships.json"
         os.makedirs(os.path.dirname(metadata_path), exist_ok=True)
         
-        # Parse group file and extract relationships
-        group_info = {}
+        # Skip regeneration if /etc/group has not changed since the last run
+        if self._metadata_is_current(metadata_path, "/etc/group"):
+            return
+        
         try:
-            with open(group_dir / "raw" / "etc_group.txt", 'r') as f:
-                for line in f:
-                    if line.strip() and not line.startswith('#'):
-                        parts = line.strip().split(':')
-                        if len(parts) >= 4:
-                            groupname, _, gid, members = parts
-                            member_list = members.split(',') if members else []
-                            group_info[groupname] = {
-                                "gid": gid,
-                                "members": member_list
-                            }
+            source_mtime = os.stat("/etc/group").st_mtime
+            
+            # Read group info through the C-level group API instead of parsing lines
+            group_info = {
+                g.gr_name: {
+                    "gid": str(g.gr_gid),
+                    "members": list(g.gr_mem)
+                }
+                for g in grp.getgrall()
+            }
             
             # Write metadata
-            with open(metadata_path, 'w') as f:
-                json.dump({"groups": group_info, "timestamp": time.time()}, f, indent=2)
+            with open(metadata_path, 'wb') as f:
+                f.write(orjson.dumps({
+                    "groups": group_info,
+                    "timestamp": time.time(),
+                    "source_mtime": source_mtime
+                }, option=orjson.OPT_INDENT_2))
                 
         except Exception as e:
             print(f"Error creating group relationships metadata: {e}")
@@ -110,6 +189,13 @@ class UserMemoryManager:
         user_hash = self._hash_api_key(api_key)
         user_dir = self.users_directory / user_hash
         
+        # Move directories named with the previous SHA-256 scheme on first use
+        if not os.path.exists(user_dir):
+            legacy_hash = hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+            legacy_dir = self.users_directory / legacy_hash
+            if os.path.exists(legacy_dir):
+                os.rename(legacy_dir, user_dir)
+        
         # Ensure user directory exists
         os.makedirs(user_dir, exist_ok=True)
         os.makedirs(user_dir / "observations", exist_ok=True)
@@ -147,13 +233,13 @@ class UserMemoryManager:
         os.makedirs(conv_path / "raw", exist_ok=True)
         os.makedirs(conv_path / "metadata", exist_ok=True)
         
-        # Initialize conversation with metadata
-        with open(conv_path / "metadata" / "context.json", 'w') as f:
-            json.dump({
-                "created_at": time.time(),
-                "last_updated": time.time(),
-                "message_count": 0
-            }, f, indent=2)
+        # Static metadata is written once; the message count lives in a
+        # fixed-width counter file whose mtime records the last update
+        with open(conv_path / "metadata" / "context.json", 'wb') as f:
+            f.write(orjson.dumps({"created_at": time.time()}, option=orjson.OPT_INDENT_2))
+        
+        with open(conv_path / "metadata" / MESSAGE_COUNT_FILE, 'wb') as f:
+            f.write((0).to_bytes(COUNTER_BYTES, 'little'))
             
         # Initialize empty messages file
         with open(conv_path / "raw" / "messages.jsonl", 'w') as f:
@@ -161,6 +247,45 @@ class UserMemoryManager:
             
         return conversation_id
     
+    def _increment_message_count(self, metadata_dir):
+        """Increment a conversation's message counter in place"""
+        counter_file = metadata_dir / MESSAGE_COUNT_FILE
+        
+        # Conversations created before the counter file existed keep their
+        # count in context.json; seed the counter from it once
+        if not os.path.exists(counter_file):
+            with open(metadata_dir / "context.json", 'rb') as f:
+                count = orjson.loads(f.read()).get("message_count", 0)
+            with open(counter_file, 'wb') as f:
+                f.write(count.to_bytes(COUNTER_BYTES, 'little'))
+        
+        with open(counter_file, 'r+b') as f:
+            count = int.from_bytes(f.read(COUNTER_BYTES), 'little') + 1
+            f.seek(0)
+            f.write(count.to_bytes(COUNTER_BYTES, 'little'))
+        
+        return count
+    
+    def get_conversation_metadata(self, api_key, conversation_id):
+        """Get creation time, last update time and message count for a conversation"""
+        user_dir = self.get_user_directory(api_key)
+        metadata_dir = user_dir / "conversations" / conversation_id / "metadata"
+        
+        try:
+            with open(metadata_dir / "context.json", 'rb') as f:
+                metadata = orjson.loads(f.read())
+            
+            counter_file = metadata_dir / MESSAGE_COUNT_FILE
+            if os.path.exists(counter_file):
+                with open(counter_file, 'rb') as f:
+                    metadata["message_count"] = int.from_bytes(f.read(COUNTER_BYTES), 'little')
+                metadata["last_updated"] = os.stat(counter_file).st_mtime
+            
+            return metadata
+        except Exception as e:
+            print(f"Error reading conversation metadata: {e}")
+            return None
+    
     def add_message_to_conversation(self, api_key, conversation_id, role, content):
         """Add a message to an existing conversation"""
         user_dir = self.get_user_directory(api_key)
@@ -178,19 +303,12 @@ class UserMemoryManager:
         }
         
         try:
-            with open(messages_file, 'a') as f:
-                f.write(json.dumps(message) + "\n")
+            writer = self._message_writer(messages_file)
+            writer.write(orjson.dumps(message) + b"\n")
+            writer.flush()
                 
-            # Update metadata
-            metadata_file = conv_path / "metadata" / "context.json"
-            with open(metadata_file, 'r') as f:
-                metadata = json.load(f)
-                
-            metadata["last_updated"] = time.time()
-            metadata["message_count"] += 1
-            
-            with open(metadata_file, 'w') as f:
-                json.dump(metadata, f, indent=2)
+            # Update metadata; the counter write also refreshes last_updated
+            self._increment_message_count(conv_path / "metadata")
                 
             return True
         except Exception as e:
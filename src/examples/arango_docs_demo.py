@@ -24,6 +24,10 @@ DEMO_QUERIES = [
     "How to perform transactions in ArangoDB?"
 ]
 
+# Separator lines used by the demo output
+SEPARATOR = "=" * 80
+BANNER_BORDER = "*" * 80
+
 def demo_direct_api():
     """
     Attempt to demonstrate retrieval using direct API access
@@ -37,14 +41,13 @@ def demo_direct_api():
         client = PathRAGClient()
         
         for query in DEMO_QUERIES:
-            print(f"\n{'=' * 80}")
-            print(f"Query: {query}")
+            print(f"\n{SEPARATOR}\nQuery: {query}")
             try:
                 result = client.retrieve_paths(query, domain_filter="python-arango-docs", max_paths=3)
                 print(f"Result: {json.dumps(result, indent=2)}")
             except Exception as e:
                 print(f"Error: {e}")
-            print(f"{'=' * 80}")
+            print(SEPARATOR)
             
         return True
         
@@ -107,9 +110,7 @@ def main():
     
     args = parser.parse_args()
     
-    print("\n" + "*" * 80)
-    print("*" + " " * 26 + "HADES ArangoDB Documentation Demo" + " " * 25 + "*")
-    print("*" * 80)
+    print(f"\n{BANNER_BORDER}\n*{'HADES ArangoDB Documentation Demo':^78}*\n{BANNER_BORDER}")
     
     if args.mode in ['direct', 'all']:
         print("\n## Direct API Access")
@@ -129,9 +130,7 @@ def main():
         print("\n## Staging Directory and Ingestion")
         demo_staging_directory()
     
-    print("\n" + "*" * 80)
-    print("*" + " " * 30 + "End of Demo" + " " * 35 + "*")
-    print("*" * 80 + "\n")
+    print(f"\n{BANNER_BORDER}\n*{'End of Demo':^78}*\n{BANNER_BORDER}\n")
     
     return 0
 
@@ -1,8 +1,80 @@
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import islice
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from ..db.connection import get_db_connection
 from ..utils.versioning import KGVersion
 
+# Maximum number of claim verification results remembered per GraphCheck
+EVIDENCE_CACHE_SIZE = 10000
+
+# Sentences are runs of text between terminal punctuation; tokens are whitespace-delimited
+_SENTENCE_RE = re.compile(r"[^.!?]+")
+_TOKEN_RE = re.compile(r"\S+")
+
+# AQL query checking which claims exist in the KG, with optional time-travel filters
+_VERIFY_CLAIMS_TEMPLATE = """
+FOR c IN @claims
+    LET evidence = FIRST(
+        FOR doc IN entities
+            FILTER doc.name_lc == c.subject
+            {entity_filter}
+            FOR v, rel IN OUTBOUND doc relationships
+                FILTER v.name_lc == c.object
+                {edge_filter}
+                LIMIT 1
+                RETURN {{
+                    "subject": KEEP(doc, "_id", "name", "version"),
+                    "predicate": KEEP(rel, "_id", "type", "version"),
+                    "object": KEEP(v, "_id", "name", "version")
+                }}
+    )
+    FILTER evidence != null
+    RETURN MERGE(evidence, {{ "idx": c.idx }})
+"""
+
+# Verification query text keyed by time-travel mode (None, "version" or "timestamp")
+_VERIFY_CLAIMS_AQL = {
+    None: _VERIFY_CLAIMS_TEMPLATE.format(entity_filter="", edge_filter=""),
+    "version": _VERIFY_CLAIMS_TEMPLATE.format(
+        entity_filter="FILTER doc.version <= @version",
+        edge_filter="FILTER v.version <= @version AND rel.version <= @version"
+    ),
+    "timestamp": _VERIFY_CLAIMS_TEMPLATE.format(
+        entity_filter="FILTER doc.created_at <= @timestamp",
+        edge_filter="FILTER v.created_at <= @timestamp AND rel.created_at <= @timestamp"
+    )
+}
+
+
+@dataclass
+class Claim:
+    """A subject-predicate-object claim extracted from text."""
+    
+    __slots__ = ("text", "subject", "predicate", "object", "subject_lc", "object_lc")
+    
+    text: str
+    subject: str
+    predicate: str
+    object: str
+    
+    def __post_init__(self) -> None:
+        # Lowercased subject and object, matched against entities' name_lc
+        self.subject_lc = self.subject.lower()
+        self.object_lc = self.object.lower()
+    
+    def to_dict(self) -> Dict[str, str]:
+        """Return the claim as a plain dictionary."""
+        return {
+            "text": self.text,
+            "subject": self.subject,
+            "predicate": self.predicate,
+            "object": self.object
+        }
+
+
 class GraphCheck:
     """
     GraphCheck implementation for fact verification against the knowledge graph.
@@ -11,43 +83,87 @@ class GraphCheck:
     def __init__(self, db_connection=None):
         self.logger = logging.getLogger(__name__)
         self.db = db_connection or get_db_connection()
+        
+        # Evidence (or None) keyed by lowercased (subject, object) plus as_of_version
+        # and as_of_timestamp, in LRU order. Only pinned lookups are cached; the
+        # current graph changes under ingestion
+        self._evidence_cache: "OrderedDict[Tuple, Optional[Dict[str, Any]]]" = OrderedDict()
     
-    def extract_claims(self, text: str) -> List[Dict[str, Any]]:
+    def iter_claims(self, text: str) -> Iterator[Claim]:
         """
-        Extract factual claims from generated text.
+        Lazily extract factual claims from generated text, one sentence at a time.
         
         Args:
             text: Generated text to analyze
             
-        Returns:
-            List of extracted claims
+        Yields:
+            Extracted claims in order of appearance
         """
-        self.logger.info(f"Extracting claims from text: {text[:100]}...")
-        
         # Implementation of claim extraction
         # This would typically use NLP techniques to identify subject-predicate-object triples
         # For demonstration, a simple approach:
-        claims = []
-        sentences = text.split('.')
-        for sentence in sentences:
-            if len(sentence.strip()) > 10:  # Arbitrary minimum length
+        for match in _SENTENCE_RE.finditer(text):
+            sentence = match.group().strip()
+            if len(sentence) > 10:  # Arbitrary minimum length
                 # Simple heuristic to identify potential claims
-                words = sentence.strip().split()
+                words = _TOKEN_RE.findall(sentence)
                 if len(words) >= 3:
                     # Create a simple S-P-O structure from the sentence
                     # In a real implementation, this would use dependency parsing
-                    claims.append({
-                        "text": sentence.strip(),
-                        "subject": words[0],
-                        "predicate": words[1] if len(words) > 1 else "",
-                        "object": " ".join(words[2:]) if len(words) > 2 else ""
-                    })
+                    yield Claim(
+                        text=sentence,
+                        subject=words[0],
+                        predicate=words[1],
+                        object=" ".join(words[2:])
+                    )
+    
+    def extract_claims(self, text: str) -> List[Claim]:
+        """
+        Extract factual claims from generated text.
+        
+        Args:
+            text: Generated text to analyze
+            
+        Returns:
+            List of extracted claims
+        """
+        self.logger.info(f"Extracting claims from text: {text[:100]}...")
+        
+        claims = list(self.iter_claims(text))
         
         self.logger.info(f"Extracted {len(claims)} claims")
         return claims
     
+    def verify_text(self,
+                    text: str,
+                    as_of_version: Optional[str] = None,
+                    as_of_timestamp: Optional[str] = None,
+                    batch_size: int = 256) -> Iterator[Dict[str, Any]]:
+        """
+        Extract and verify claims from text as a streaming pipeline.
+        
+        Claims are verified in batches as they are extracted, so the first
+        query is sent before the whole text has been scanned and only one
+        batch of claims is held in memory at a time.
+        
+        Args:
+            text: Generated text to analyze
+            as_of_version: Optional version string to verify against the KG as it existed at a specific version
+            as_of_timestamp: Optional timestamp to verify against the KG as it existed at a specific time
+            batch_size: Number of claims verified per query
+            
+        Yields:
+            Claims with verification results, in order of appearance
+        """
+        claims = self.iter_claims(text)
+        while True:
+            batch = list(islice(claims, batch_size))
+            if not batch:
+                return
+            yield from self.verify_claims(batch, as_of_version, as_of_timestamp)
+    
     def verify_claims(self, 
-                     claims: List[Dict[str, Any]], 
+                     claims: List[Claim], 
                      as_of_version: Optional[str] = None,
                      as_of_timestamp: Optional[str] = None) -> List[Dict[str, Any]]:
         """
@@ -63,60 +179,114 @@ class GraphCheck:
         """
         self.logger.info(f"Verifying {len(claims)} claims")
         
-        verified_claims = []
+        if not claims:
+            return []
         
-        for claim in claims:
-            # Version-aware query parameters
-            query_params = {
-                "subject": claim["subject"],
-                "object": claim["object"]
-            }
-            
-            # Handle version specification for time-travel verification
-            version_clause = ""
-            if as_of_version:
-                version = KGVersion.parse(as_of_version)
-                query_params["version"] = version.to_string()
-                version_clause = "FILTER doc.version <= @version AND rel.version <= @version"
-            elif as_of_timestamp:
-                query_params["timestamp"] = as_of_timestamp
-                version_clause = "FILTER doc.created_at <= @timestamp AND rel.created_at <= @timestamp"
-            
-            # AQL query with version support for checking if the claim exists in the KG
-            aql_query = f"""
-            FOR doc IN entities
-                FILTER doc.name == @subject
-                {version_clause.replace('doc.', 'doc.').replace('rel.', 'rel.')}
-                FOR rel IN OUTBOUND doc relationships
-                    {version_clause.replace('doc.', 'v.').replace('rel.', 'rel.')}
-                    FOR v IN entities
-                        FILTER v.name == @object
-                        RETURN {{
-                            "subject": doc,
-                            "predicate": rel,
-                            "object": v
-                        }}
-            """
-            
-            cursor = self.db.aql.execute(aql_query, bind_vars=query_params)
-            results = [doc for doc in cursor]
-            
-            # Determine if the claim is verified
-            is_verified = len(results) > 0
-            evidence = results[0] if is_verified and results else None
+        # A version or timestamp pins the graph state, so those answers stay valid;
+        # current-state lookups always go to the DB
+        use_cache = bool(as_of_version or as_of_timestamp)
+        
+        # Only claims with both ends that have not been verified before need the DB
+        cache_keys = [
+            (claim.subject_lc, claim.object_lc, as_of_version, as_of_timestamp)
+            for claim in claims
+        ]
+        resolved = {}
+        pending = {}
+        for idx, (claim, key) in enumerate(zip(claims, cache_keys)):
+            if not claim.subject or not claim.object:
+                continue
+            if use_cache and key in self._evidence_cache:
+                self._evidence_cache.move_to_end(key)
+                resolved[key] = self._evidence_cache[key]
+            else:
+                pending.setdefault(key, idx)
+        
+        if pending:
+            evidence_by_idx = self._query_evidence(
+                [claims[idx] for idx in pending.values()],
+                as_of_version,
+                as_of_timestamp
+            )
+            for position, key in enumerate(pending):
+                resolved[key] = evidence_by_idx.get(position)
+                if use_cache:
+                    self._evidence_cache[key] = resolved[key]
             
+            # Evict least recently used entries
+            while len(self._evidence_cache) > EVIDENCE_CACHE_SIZE:
+                self._evidence_cache.popitem(last=False)
+        
+        verified_claims = []
+        verified_count = 0
+        for claim, key in zip(claims, cache_keys):
+            evidence = resolved.get(key)
+            verified_count += evidence is not None
             verified_claim = {
-                **claim,
-                "is_verified": is_verified,
+                **claim.to_dict(),
+                "is_verified": evidence is not None,
                 "evidence": evidence,
                 "confidence": self._calculate_confidence(claim, evidence)
             }
             verified_claims.append(verified_claim)
         
-        self.logger.info(f"Verification complete: {sum(c['is_verified'] for c in verified_claims)}/{len(verified_claims)} claims verified")
+        self.logger.info(f"Verification complete: {verified_count}/{len(verified_claims)} claims verified")
         return verified_claims
     
-    def _calculate_confidence(self, claim: Dict[str, Any], evidence: Optional[Dict[str, Any]]) -> float:
+    def _query_evidence(self,
+                        claims: List[Claim],
+                        as_of_version: Optional[str] = None,
+                        as_of_timestamp: Optional[str] = None) -> Dict[int, Dict[str, Any]]:
+        """
+        Look up evidence for claims in the knowledge graph with a single query.
+        
+        Args:
+            claims: Claims to look up; each must have a subject and an object
+            as_of_version: Optional version string to verify against
+            as_of_timestamp: Optional timestamp to verify against
+            
+        Returns:
+            Evidence keyed by the claim's position in the list, for verified claims only
+        """
+        # All claims are checked in one query; each gets its position so
+        # results can be matched back to the claim they belong to
+        query_params = {
+            "claims": [
+                {"idx": idx, "subject": claim.subject_lc, "object": claim.object_lc}
+                for idx, claim in enumerate(claims)
+            ]
+        }
+        
+        # Handle version specification for time-travel verification
+        mode = None
+        if as_of_version:
+            # Normalize once per call; parse_version is memoized across calls
+            query_params["version"] = KGVersion.generate_version_id(*KGVersion.parse_version(as_of_version))
+            mode = "version"
+        elif as_of_timestamp:
+            query_params["timestamp"] = as_of_timestamp
+            mode = "timestamp"
+        
+        # Constant query text per mode lets the server reuse plans and cached results
+        cursor = self.db.aql.execute(
+            _VERIFY_CLAIMS_AQL[mode],
+            bind_vars=query_params,
+            cache=True,
+            count=False
+        )
+        
+        # The query returns at most one piece of evidence per verified claim
+        evidence_by_idx = {}
+        try:
+            for result in cursor:
+                evidence_by_idx[result.pop("idx")] = result
+        finally:
+            # Release the server-side cursor now rather than when it times out
+            cursor.close(ignore_missing=True)
+        
+        return evidence_by_idx
+    
+    def _calculate_confidence(self, claim: Claim, evidence: Optional[Dict[str, Any]]) -> float:
         """
         Calculate confidence score for the verification result.
         
@@ -134,10 +304,10 @@ class GraphCheck:
         # For now, using a simple approach based on exact matches
         confidence = 1.0  # Start with perfect confidence
         
-        # Reduce confidence for partial matches
-        if evidence["subject"]["name"].lower() != claim["subject"].lower():
+        # Reduce confidence for matches that differ only in case
+        if evidence["subject"]["name"] != claim.subject:
             confidence *= 0.8
-        if evidence["object"]["name"].lower() != claim["object"].lower():
+        if evidence["object"]["name"] != claim.object:
             confidence *= 0.8
             
         return confidence 
\ No newline at end of file
@@ -1,10 +1,19 @@
 from typing import Any, Dict, List, Optional
 import logging
 import torch
-from transformers import BertTokenizer, BertModel
+from transformers import AutoModel, AutoTokenizer
+
+from src.utils.embeddings import EmbeddingCache, encode_embedding_blob, mean_pool
 
 logger = logging.getLogger(__name__)
 
+# Claims only need a pooled embedding, so a distilled encoder is enough
+DEFAULT_MODEL_NAME = 'distilbert-base-uncased'
+
+# Maximum number of claims encoded per forward pass
+BUCKET_SIZE = 32
+
+
 class GraphCheck:
     """
     GraphCheck module for HADES.
@@ -12,11 +21,81 @@ class GraphCheck:
     This module handles the verification of facts using a graph neural network (GNN).
     """
 
-    def __init__(self):
-        """Initialize the GraphCheck module."""
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL_NAME,
+        quantize: bool = False,
+        compile_model: bool = False
+    ):
+        """
+        Initialize the GraphCheck module.
+        
+        Args:
+            model_name: Hugging Face name of the encoder used to embed claims
+            quantize: Whether to apply dynamic int8 quantization to the model's
+                linear layers when running on CPU
+            compile_model: Whether to compile the model with torch.compile, fusing
+                attention and LayerNorm kernels at the cost of a slower first call
+        """
         logger.info("Initializing GraphCheck module")
-        self.tokenizer = BertTokenizer.from_pretrained('bert-base-uncased')
-        self.model = BertModel.from_pretrained('bert-base-uncased')
+        self.model_name = model_name
+        self.quantize = quantize
+        self.compile_model = compile_model
+        
+        # The encoder is loaded on first use so ingestion-only code paths that
+        # construct GraphCheck never pay for it
+        self._tokenizer = None
+        self._model = None
+        
+        # Embeddings of recently seen claim texts
+        self._embedding_cache = EmbeddingCache()
+
+    def _ensure_model(self) -> None:
+        """Load the tokenizer and model if they have not been loaded yet."""
+        if self._model is not None and self._tokenizer is not None:
+            return
+        
+        logger.info(f"Loading GraphCheck encoder: {self.model_name}")
+        # The Rust-backed fast tokenizer handles batches natively and releases the GIL
+        self._tokenizer = AutoTokenizer.from_pretrained(self.model_name, use_fast=True)
+        model = AutoModel.from_pretrained(self.model_name)
+        
+        # Inference only: disable dropout and run on the GPU in half precision when available
+        model.eval()
+        if torch.cuda.is_available():
+            model = model.half().cuda()
+        elif self.quantize:
+            # Dynamic int8 quantization operates on the fp32 CPU model
+            model = torch.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        else:
+            model = model.to(torch.bfloat16)
+        
+        if self.compile_model:
+            # Claim batches vary in length, so compile for dynamic shapes up front
+            model = torch.compile(model, dynamic=True)
+        self._model = model
+
+    @property
+    def tokenizer(self):
+        """Claim tokenizer, loaded on first access."""
+        self._ensure_model()
+        return self._tokenizer
+
+    @tokenizer.setter
+    def tokenizer(self, tokenizer) -> None:
+        self._tokenizer = tokenizer
+
+    @property
+    def model(self):
+        """Claim encoder, loaded on first access."""
+        self._ensure_model()
+        return self._model
+
+    @model.setter
+    def model(self, model) -> None:
+        self._model = model
 
     def verify_claims(
         self,
@@ -39,14 +118,34 @@ class GraphCheck:
         try:
             verified_claims = []
             
+            # Skip claims without text up front so the batch only holds real inputs
+            claims_with_text = []
             for claim in claims:
-                # Verify each claim
-                verification_result = self._verify_claim(claim, as_of_version)
-                if not verification_result:
-                    logger.warning(f"Failed to verify claim: {claim}")
+                if not claim.get("text"):
+                    logger.warning(f"No text found in claim: {claim}")
                     continue
+                claims_with_text.append(claim)
+            
+            if claims_with_text:
+                # Reuse embeddings of previously seen claims; encode the rest in batches
+                embeddings = self._embedding_cache.get_or_encode(
+                    [claim["text"] for claim in claims_with_text], self._encode_claims
+                )
                 
-                verified_claims.append(verification_result)
+                for claim, vector in zip(claims_with_text, embeddings):
+                    # Placeholder for GNN verification logic
+                    is_verified = True  # This should be replaced with actual GNN verification
+                    
+                    verified_claims.append({
+                        "claim": claim,
+                        "is_verified": is_verified,
+                        "version": as_of_version or "v0.0.0",
+                        "embedding_dim": int(vector.shape[0]),
+                        "embedding_dtype": "fp16",
+                        "embedding_blob": encode_embedding_blob(vector)
+                    })
+            
+            logger.info(f"Verified {len(verified_claims)} claims")
             
             return {
                 "success": True,
@@ -61,48 +160,80 @@ class GraphCheck:
                 "error": str(e)
             }
 
-    def _verify_claim(
-        self,
-        claim: Dict[str, Any],
-        as_of_version: Optional[str] = None
-    ) -> Optional[Dict[str, Any]]:
+    def _encode_claims(self, texts: List[str], bucket_size: int = BUCKET_SIZE) -> torch.Tensor:
         """
-        Verify a single factual claim.
+        Encode claim texts through BERT in length-bucketed batches.
+        
+        Claims are grouped with others of similar length so each batch pads
+        to a short maximum instead of the longest claim overall.
         
         Args:
-            claim: The claim to verify
-            as_of_version: Optional version to query against
+            texts: Claim texts to encode
+            bucket_size: Maximum number of claims per forward pass
             
         Returns:
-            Verification result or None if verification failed
+            Float16 tensor of shape (len(texts), hidden_size) with one embedding per claim,
+            in input order
         """
-        # Placeholder for claim verification logic using a GNN
-        try:
-            text = claim.get("text")
-            if not text:
-                logger.warning(f"No text found in claim: {claim}")
-                return None
-            
-            inputs = self.tokenizer(text, return_tensors="pt", truncation=True, padding=True)
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-            
-            # Use the mean of token embeddings as the document embedding
-            embedding_vector = outputs.last_hidden_state.mean(dim=1).squeeze().tolist()
+        if len(texts) <= bucket_size:
+            return self._encode_batch(texts)
+        
+        # Character length is a cheap proxy for token length that avoids tokenizing twice
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        
+        embeddings = None
+        for start in range(0, len(order), bucket_size):
+            bucket = order[start:start + bucket_size]
+            pooled = self._encode_batch([texts[i] for i in bucket])
             
-            # Placeholder for GNN verification logic
-            is_verified = True  # This should be replaced with actual GNN verification
+            if embeddings is None:
+                embeddings = pooled.new_empty((len(texts), pooled.shape[1]))
             
-            verification_result = {
-                "claim": claim,
-                "is_verified": is_verified,
-                "version": as_of_version or "v0.0.0",
-                "embedding_vector": embedding_vector
-            }
+            # Scatter the bucket back to the claims' original positions
+            embeddings[bucket] = pooled
+        
+        return embeddings
+
+    def _encode_batch(self, texts: List[str]) -> torch.Tensor:
+        """
+        Encode claim texts through BERT in a single forward pass.
+        
+        Args:
+            texts: Claim texts to encode
             
-            logger.info(f"Verified claim: {claim}")
-            return verification_result
+        Returns:
+            Float16 tensor of shape (len(texts), hidden_size) with one embedding per claim
+        """
+        inputs = self.tokenizer(
+            texts,
+            return_tensors="pt",
+            truncation=True,
+            padding="longest",
+            max_length=512
+        ).to(self.model.device)
         
-        except Exception as e:
-            logger.exception("An error occurred while verifying a claim")
-            return None
+        with torch.inference_mode():
+            hidden = self.model(**inputs).last_hidden_state
+        
+        embeddings = mean_pool(hidden, inputs["attention_mask"])
+        
+        # Claims are returned and cached as float16, which is ample precision for
+        # embeddings and halves their size
+        return embeddings.to(torch.float16).cpu()
+
+
+# Shared verifier, created by get_graphcheck() the first time claims are verified
+_graphcheck: Optional[GraphCheck] = None
+
+
+def get_graphcheck() -> GraphCheck:
+    """
+    Get the shared GraphCheck instance, creating it on first use.
+    
+    Returns:
+        The shared GraphCheck instance
+    """
+    global _graphcheck
+    if _graphcheck is None:
+        _graphcheck = GraphCheck()
+    return _graphcheck
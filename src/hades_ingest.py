@@ -6,19 +6,45 @@ Unified script for preparing and ingesting documentation into HADES
 import os
 import sys
 import json
+import orjson
 import argparse
-import requests
+import asyncio
+import functools
+import httpx
 from pathlib import Path
-from glob import glob
 from bs4 import BeautifulSoup
+import lxml.etree
+import lxml.html
 import markdownify
 import time
+from urllib.parse import urldefrag, urljoin, urlparse
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+# Add the project root to the Python path so the shared helpers import when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.web import SESSION, SKIP_LINK_RE, STRIP_SELECTOR
+
+HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
+
+# Number of pages fetched concurrently while crawling
+CRAWL_CONCURRENCY = 10
 
 def fetch_url(url):
     """Fetch a URL and return its content"""
     try:
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-        response = requests.get(url, headers=headers, timeout=30)
+        response = SESSION.get(url, headers=HEADERS, timeout=30)
+        response.raise_for_status()
+        return response.text
+    except Exception as e:
+        print(f"Error fetching {url}: {e}")
+        return None
+
+async def fetch(client, url):
+    """Fetch a URL with a shared async client and return its content"""
+    try:
+        response = await client.get(url, timeout=30, headers=HEADERS)
         response.raise_for_status()
         return response.text
     except Exception as e:
@@ -31,11 +57,11 @@ def convert_to_markdown(html_content, output_file=None):
         return None
     
     # Parse HTML with BeautifulSoup
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = BeautifulSoup(html_content, 'lxml')
     
-    # Remove script and style elements
-    for script in soup(["script", "style"]):
-        script.extract()
+    # Remove scripts, styles and page chrome in one pass
+    for element in soup.select(STRIP_SELECTOR):
+        element.decompose()
     
     # Convert to markdown
     md_converter = markdownify.MarkdownConverter(heading_style="ATX")
@@ -80,18 +106,26 @@ def prepare_document(markdown_file, domain="python-arango-docs"):
         print(f"Error preparing {markdown_file}: {e}")
         return None
 
+def prepare_documents(markdown_files, domain="python-arango-docs"):
+    """Prepare markdown files for ingestion in parallel across CPU cores"""
+    prepare = functools.partial(prepare_document, domain=domain)
+    with ProcessPoolExecutor() as executor:
+        documents = [doc for doc in executor.map(prepare, markdown_files, chunksize=32) if doc]
+    
+    for doc in documents:
+        print(f"Prepared {doc['id']} for ingestion")
+    return documents
+
 def ingest_to_hades(data_points, domain="python-arango-docs", batch_size=5, output_dir=None):
     """Ingest data into HADES knowledge graph via direct import or MCP client
     
     Args:
-        data_points: List of document dictionaries to ingest
+        data_points: Iterable of document dictionaries to ingest; consumed lazily,
+            so only one batch is held in memory at a time
         domain: Domain name for the documents
         batch_size: Number of documents per batch
         output_dir: Directory to save batch files (defaults to data/staging/{domain})
     """
-    total = len(data_points)
-    batches = [data_points[i:i+batch_size] for i in range(0, total, batch_size)]
-    
     # Set up staging directory
     script_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.dirname(script_dir)
@@ -104,7 +138,7 @@ def ingest_to_hades(data_points, domain="python-arango-docs", batch_size=5, outp
     # Ensure staging directory exists
     os.makedirs(output_dir, exist_ok=True)
     
-    print(f"Ingesting {total} data points in {len(batches)} batches...")
+    print(f"Ingesting data points in batches of {batch_size}...")
     print(f"Staging directory: {output_dir}")
     
     # Try to use direct client if available
@@ -122,21 +156,30 @@ def ingest_to_hades(data_points, domain="python-arango-docs", batch_size=5, outp
         print("Could not import PathRAGClient directly. Will save batches to files.")
     
     batch_files = []
-    
-    # Process all batches
-    for i, batch in enumerate(batches, 1):
+    total = 0
+    num_batches = 0
+    
+    # Process batches as they are pulled from the input
+    data_points = iter(data_points)
+    while True:
+        batch = list(islice(data_points, batch_size))
+        if not batch:
+            break
+        total += len(batch)
+        num_batches += 1
+        i = num_batches
         try:
             # Save batch to file regardless of direct import capability
-            batch_file = os.path.join(output_dir, f"batch_{i}_of_{len(batches)}.json")
-            with open(batch_file, 'w', encoding='utf-8') as f:
-                json.dump(batch, f, indent=2)
+            batch_file = os.path.join(output_dir, f"batch_{i}.json")
+            with open(batch_file, 'wb') as f:
+                f.write(orjson.dumps(batch, option=orjson.OPT_INDENT_2))
             batch_files.append(batch_file)
-            print(f"Saved batch {i}/{len(batches)} to {batch_file}")
+            print(f"Saved batch {i} to {batch_file}")
             
             # If direct import is available, use it
             if direct_import and client:
                 try:
-                    print(f"Ingesting batch {i}/{len(batches)} ({len(batch)} items)...")
+                    print(f"Ingesting batch {i} ({len(batch)} items)...")
                     result = client.ingest_data(batch, domain=domain)
                     print(f"Batch {i} result: {result}")
                 except Exception as e:
@@ -167,7 +210,7 @@ def ingest_to_hades(data_points, domain="python-arango-docs", batch_size=5, outp
         "domain": domain,
         "total_documents": total,
         "batch_size": batch_size,
-        "num_batches": len(batches),
+        "num_batches": num_batches,
         "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
         "batch_files": batch_files,
         "direct_import_attempted": direct_import,
@@ -175,80 +218,123 @@ def ingest_to_hades(data_points, domain="python-arango-docs", batch_size=5, outp
     }
     
     manifest_file = os.path.join(output_dir, "manifest.json")
-    with open(manifest_file, 'w', encoding='utf-8') as f:
-        json.dump(manifest, f, indent=2)
+    with open(manifest_file, 'wb') as f:
+        f.write(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
     print(f"\nCreated manifest file: {manifest_file}")
     
     print(f"Ingestion process completed for {total} data points")
     return True
 
-def crawl_site(base_url, output_dir, max_pages=100, domain="docs"):
-    """Crawl a website and convert pages to markdown"""
-    visited = set()
-    to_visit = [base_url]
-    count = 0
+def process_page(html_content, url, base_url, output_dir):
+    """Save a crawled page as markdown and return the links to follow from it"""
+    page_url = url
     
-    os.makedirs(output_dir, exist_ok=True)
+    # Convert URL to filename
+    if url.endswith('/'):
+        url = url[:-1]
     
-    while to_visit and count < max_pages:
-        url = to_visit.pop(0)
-        if url in visited:
-            continue
-        
-        visited.add(url)
-        count += 1
-        
-        print(f"Processing {count}/{max_pages}: {url}")
-        
-        html_content = fetch_url(url)
-        if not html_content:
+    page_name = url.split('/')[-1]
+    if not page_name or page_name == base_url.split('/')[-1]:
+        page_name = "index"
+    
+    if not page_name.endswith('.html'):
+        page_name += '.md'
+    else:
+        page_name = page_name.replace('.html', '.md')
+    
+    output_file = os.path.join(output_dir, page_name)
+    
+    # Convert to markdown
+    convert_to_markdown(html_content, output_file)
+    
+    # Find links to follow; the lxml tree yields href strings directly
+    # without building a BeautifulSoup tag per anchor
+    try:
+        tree = lxml.html.fromstring(html_content)
+    except (ValueError, lxml.etree.ParserError) as e:
+        # str input with an XML encoding declaration, or an empty document
+        print(f"Error parsing links from {page_url}: {e}")
+        return []
+    base_host = urlparse(base_url).netloc
+    links = []
+    for href in tree.xpath('//a/@href'):
+        # Skip external links, anchors, etc.
+        if SKIP_LINK_RE.match(href):
             continue
-        
-        # Parse the page
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Convert URL to filename
-        if url.endswith('/'):
-            url = url[:-1]
-        
-        page_name = url.split('/')[-1]
-        if not page_name or page_name == base_url.split('/')[-1]:
-            page_name = "index"
-        
-        if not page_name.endswith('.html'):
-            page_name += '.md'
-        else:
-            page_name = page_name.replace('.html', '.md')
-        
-        output_file = os.path.join(output_dir, page_name)
-        
-        # Convert to markdown
-        convert_to_markdown(html_content, output_file)
-        
-        # Find links to follow
-        for link in soup.find_all('a', href=True):
-            href = link['href']
             
-            # Skip external links, anchors, etc.
-            if href.startswith('#') or href.startswith('javascript:') or href.startswith('mailto:'):
-                continue
+        # Resolve relative URLs and drop fragments so each page has one canonical form
+        href = urldefrag(urljoin(page_url, href))[0]
+        
+        # Only follow links within the same domain
+        if base_host in href:
+            links.append(href)
+    
+    return links
+
+async def crawl_async(base_url, output_dir, max_pages=100, concurrency=CRAWL_CONCURRENCY):
+    """Crawl a website with concurrent workers sharing one pooled HTTP client"""
+    visited = set()
+    to_visit = asyncio.Queue()
+    to_visit.put_nowait(base_url)
+    # Every URL ever queued; the frontier never holds duplicates or more
+    # pages than will be crawled
+    queued = {base_url}
+    count = 0
+    
+    os.makedirs(output_dir, exist_ok=True)
+    loop = asyncio.get_running_loop()
+    
+    async def worker(client):
+        nonlocal count
+        while True:
+            url = await to_visit.get()
+            try:
+                if count >= max_pages:
+                    continue
                 
-            # Handle relative URLs
-            if not href.startswith('http'):
-                if href.startswith('/'):
-                    # Absolute path relative to domain
-                    domain = '/'.join(base_url.split('/')[:3])
-                    href = domain + href
-                else:
-                    # Relative to current page
-                    href = os.path.dirname(url) + '/' + href
-            
-            # Only follow links within the same domain
-            if base_url.split('/')[2] in href and href not in visited:
-                to_visit.append(href)
+                visited.add(url)
+                count += 1
+                
+                print(f"Processing {count}/{max_pages}: {url}")
+                
+                html_content = await fetch(client, url)
+                if not html_content:
+                    continue
+                
+                # Parsing and markdown conversion are CPU-bound, so keep them
+                # off the event loop while other workers wait on the network
+                links = await loop.run_in_executor(
+                    None, process_page, html_content, url, base_url, output_dir
+                )
+                
+                for link in links:
+                    if len(queued) >= max_pages:
+                        break
+                    if link not in queued:
+                        queued.add(link)
+                        to_visit.put_nowait(link)
+            except Exception as e:
+                # A failing page must not kill the worker, or join() never returns
+                print(f"Error processing {url}: {e}")
+            finally:
+                to_visit.task_done()
+    
+    # Keep-alive connections are reused across pages instead of reconnecting per URL
+    limits = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+    async with httpx.AsyncClient(limits=limits, follow_redirects=True) as client:
+        workers = [asyncio.create_task(worker(client)) for _ in range(concurrency)]
+        await to_visit.join()
+        
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
     
     return visited
 
+def crawl_site(base_url, output_dir, max_pages=100, domain="docs"):
+    """Crawl a website and convert pages to markdown"""
+    return asyncio.run(crawl_async(base_url, output_dir, max_pages))
+
 def main():
     parser = argparse.ArgumentParser(description="Prepare and ingest documentation into HADES")
     subparsers = parser.add_subparsers(dest='command', help='Command to execute')
@@ -298,21 +384,15 @@ def main():
     
     elif args.command == 'prepare':
         # Find all markdown files in the input directory
-        markdown_files = glob(os.path.join(args.input_dir, '**/*.md'), recursive=True)
+        markdown_files = list(Path(args.input_dir).rglob('*.md'))
         print(f"Found {len(markdown_files)} markdown files")
         
         # Prepare documents
-        documents = []
-        for md_file in markdown_files:
-            print(f"Preparing {md_file}")
-            doc = prepare_document(md_file, args.domain)
-            if doc:
-                documents.append(doc)
-                print(f"Prepared {doc['id']} for ingestion")
+        documents = prepare_documents(markdown_files, args.domain)
         
         # Save to JSON file
-        with open(args.output, 'w', encoding='utf-8') as f:
-            json.dump(documents, f, indent=2)
+        with open(args.output, 'wb') as f:
+            f.write(orjson.dumps(documents, option=orjson.OPT_INDENT_2))
         print(f"Saved {len(documents)} documents to {args.output}")
     
     elif args.command == 'ingest':
@@ -333,21 +413,15 @@ def main():
         crawl_site(args.base_url, md_dir, args.max_pages, args.domain)
         
         # Find all markdown files in the markdown directory
-        markdown_files = glob(os.path.join(md_dir, '**/*.md'), recursive=True)
+        markdown_files = list(Path(md_dir).rglob('*.md'))
         print(f"Found {len(markdown_files)} markdown files")
         
         # Prepare documents
-        documents = []
-        for md_file in markdown_files:
-            print(f"Preparing {md_file}")
-            doc = prepare_document(md_file, args.domain)
-            if doc:
-                documents.append(doc)
-                print(f"Prepared {doc['id']} for ingestion")
+        documents = prepare_documents(markdown_files, args.domain)
         
         # Save to JSON file
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(documents, f, indent=2)
+        with open(json_file, 'wb') as f:
+            f.write(orjson.dumps(documents, option=orjson.OPT_INDENT_2))
         print(f"Saved {len(documents)} documents to {json_file}")
         
         # Ingest documents
@@ -6,10 +6,16 @@ Script to ingest markdownified documentation into HADES knowledge graph
 import os
 import sys
 import argparse
-import json
-import glob
+import orjson
+import functools
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
 from pathlib import Path
 
+# Number of files handed to the process pool at a time, bounding how many
+# prepared documents can be waiting in memory
+PREPARE_WINDOW = 1024
+
 def read_markdown_file(file_path):
     """Read markdown file content"""
     try:
@@ -19,58 +25,75 @@ def read_markdown_file(file_path):
         print(f"Error reading file {file_path}: {e}")
         return None
 
-def prepare_data_for_ingest(base_dir, domain="python-arango-docs"):
+def _prepare_one(file_path, base_dir, domain):
     """
-    Prepare data for ingestion into HADES knowledge graph
+    Build the data point for a single markdown file, or None if it is empty
     """
-    data_points = []
-    
-    # Get all markdown files recursively
-    md_files = glob.glob(os.path.join(base_dir, "**/*.md"), recursive=True)
+    # Extract title from file path - use the filename without extension
+    file_name = os.path.basename(file_path)
+    title = os.path.splitext(file_name)[0]
     
-    for file_path in md_files:
-        # Extract title from file path - use the filename without extension
-        file_name = os.path.basename(file_path)
-        title = os.path.splitext(file_name)[0]
+    # For better titles, replace underscores and hyphens with spaces and capitalize
+    title = title.replace('_', ' ').replace('-', ' ').title()
+    if title.lower() == "index":
+        title = "Python ArangoDB Documentation"
         
-        # For better titles, replace underscores and hyphens with spaces and capitalize
-        title = title.replace('_', ' ').replace('-', ' ').title()
-        if title.lower() == "index":
-            title = "Python ArangoDB Documentation"
-            
-        # Read the content of the markdown file
-        content = read_markdown_file(file_path)
-        if not content:
-            continue
-            
-        # Create a unique ID based on the file path
-        rel_path = os.path.relpath(file_path, base_dir)
-        doc_id = rel_path.replace('/', '_').replace('.', '_').replace(' ', '_')
+    # Read the content of the markdown file
+    content = read_markdown_file(file_path)
+    if not content:
+        return None
         
-        # Create the data point
-        data_point = {
-            "id": doc_id,
-            "title": title,
-            "content": content,
-            "source": f"file://{os.path.abspath(file_path)}",
-            "metadata": {
-                "type": "documentation",
-                "domain": domain,
-                "path": rel_path
-            }
+    # Create a unique ID based on the file path
+    rel_path = os.path.relpath(file_path, base_dir)
+    doc_id = rel_path.replace('/', '_').replace('.', '_').replace(' ', '_')
+    
+    # Create the data point
+    data_point = {
+        "id": doc_id,
+        "title": title,
+        "content": content,
+        "source": f"file://{os.path.abspath(file_path)}",
+        "metadata": {
+            "type": "documentation",
+            "domain": domain,
+            "path": rel_path
         }
-        
-        data_points.append(data_point)
-        print(f"Prepared {rel_path} for ingestion")
+    }
+    
+    print(f"Prepared {rel_path} for ingestion")
+    return data_point
+
+def prepare_data_for_ingest(base_dir, domain="python-arango-docs"):
+    """
+    Prepare data for ingestion into HADES knowledge graph, yielding data points
+    as they are ready
+    """
+    # Get all markdown files recursively
+    md_files = Path(base_dir).rglob("*.md")
     
-    return data_points
+    # Files are independent, so spread reading and processing across cores
+    prepare = functools.partial(_prepare_one, base_dir=base_dir, domain=domain)
+    with ProcessPoolExecutor() as executor:
+        while True:
+            window = list(islice(md_files, PREPARE_WINDOW))
+            if not window:
+                return
+            for data_point in executor.map(prepare, window, chunksize=32):
+                if data_point:
+                    yield data_point
 
 def save_ingest_data(data_points, output_file):
-    """Save data for ingestion to a JSON file"""
+    """Save data for ingestion to a JSON file, writing one data point at a time"""
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(data_points, f, indent=2)
-        print(f"Data saved to {output_file}")
+        count = 0
+        with open(output_file, 'wb') as f:
+            f.write(b"[")
+            for data_point in data_points:
+                f.write(b",\n" if count else b"\n")
+                f.write(orjson.dumps(data_point, option=orjson.OPT_INDENT_2))
+                count += 1
+            f.write(b"\n]\n")
+        print(f"Saved {count} data points to {output_file}")
         return True
     except Exception as e:
         print(f"Error saving data to {output_file}: {e}")
@@ -85,11 +108,12 @@ def main():
     args = parser.parse_args()
     
     data_points = prepare_data_for_ingest(args.source_dir, args.domain)
-    if not data_points:
+    first = next(data_points, None)
+    if first is None:
         print("No data points to ingest")
         return 1
         
-    return 0 if save_ingest_data(data_points, args.output) else 1
+    return 0 if save_ingest_data(chain([first], data_points), args.output) else 1
 
 if __name__ == "__main__":
     sys.exit(main())
@@ -7,6 +7,7 @@ import os
 import sys
 import argparse
 import json
+import orjson
 import requests
 
 def load_ingest_data(json_file):
@@ -34,8 +35,8 @@ def ingest_data_to_hades(data_points, domain="python-arango-docs", batch_size=5)
     batch_files = []
     for i, batch in enumerate(batches, 1):
         batch_file = f"batch_{i}_of_{len(batches)}.json"
-        with open(batch_file, 'w', encoding='utf-8') as f:
-            json.dump(batch, f, indent=2)
+        with open(batch_file, 'wb') as f:
+            f.write(orjson.dumps(batch, option=orjson.OPT_INDENT_2))
         batch_files.append(batch_file)
         print(f"Saved batch {i}/{len(batches)} to {batch_file}")
     
@@ -6,12 +6,24 @@ Script to markdownify an entire website by crawling links
 import os
 import sys
 import re
-import requests
 from bs4 import BeautifulSoup
-from markdownify import markdownify as md
+from markdownify import MarkdownConverter
 import argparse
 import pathvalidate
 import urllib.parse
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# Add the project root to the Python path so the shared helpers import when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.web import SESSION, SKIP_LINK_RE, STRIP_SELECTOR
+
+# Absolute URL schemes
+_ABS_RE = re.compile(r'^https?://')
+
+# Number of pages fetched and converted concurrently while crawling
+CRAWL_WORKERS = 16
 
 def markdownify_url(url, output_path, base_url=None):
     """
@@ -20,12 +32,12 @@ def markdownify_url(url, output_path, base_url=None):
     """
     try:
         print(f"Fetching URL: {url}")
-        response = requests.get(url)
+        response = SESSION.get(url)
         response.raise_for_status()
         
         print(f"Converting to Markdown...")
         html = response.text
-        soup = BeautifulSoup(html, features="html.parser")
+        soup = BeautifulSoup(html, features="lxml")
         
         # Get all links for crawling
         links = []
@@ -33,22 +45,22 @@ def markdownify_url(url, output_path, base_url=None):
             for a_tag in soup.find_all('a', href=True):
                 href = a_tag['href']
                 # Filter out external links and anchors
-                if href.startswith(('http://', 'https://')):
+                if _ABS_RE.match(href):
                     # Only include links to the same domain
                     if base_url in href and href.endswith('.html'):
                         links.append(href)
-                elif not href.startswith(('mailto:', 'tel:', '#', 'javascript:')):
+                elif not SKIP_LINK_RE.match(href):
                     # Handle relative URLs
                     if href.endswith('.html'):
                         absolute_url = urllib.parse.urljoin(url, href)
                         links.append(absolute_url)
         
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.decompose()
+        # Remove scripts, styles and page chrome in one pass
+        for element in soup.select(STRIP_SELECTOR):
+            element.decompose()
             
         # Convert to markdown
-        markdown = md(str(soup), heading_style="ATX")
+        markdown = MarkdownConverter(heading_style="ATX").convert_soup(soup)
         
         # Sanitize output path
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
@@ -64,57 +76,71 @@ def markdownify_url(url, output_path, base_url=None):
         print(f"Error processing {url}: {e}")
         return []
 
-def crawl_site(start_url, output_dir, max_pages=20):
+def output_path_for(url, output_dir, base_path):
+    """
+    Map a page URL to the markdown file it is saved as under output_dir
+    """
+    parsed_url = urllib.parse.urlparse(url)
+    path = parsed_url.path
+    
+    # Handle the base URL specially
+    if path.endswith('/') or path == "":
+        filename = "index"
+    else:
+        # Extract just the filename without extension
+        filename = os.path.basename(path).replace('.html', '')
+    
+    # Get the directory part relative to the base
+    dir_path = os.path.dirname(path)
+    if base_path and dir_path.startswith(base_path):
+        dir_path = dir_path[len(base_path):].lstrip('/')
+    
+    # Create the final output path
+    if dir_path:
+        rel_dir = os.path.join(output_dir, dir_path)
+        os.makedirs(rel_dir, exist_ok=True)
+        return os.path.join(rel_dir, f"{filename}.md")
+    return os.path.join(output_dir, f"{filename}.md")
+
+def crawl_site(start_url, output_dir, max_pages=20, workers=CRAWL_WORKERS):
     """
     Crawl a site starting from start_url and save markdown to output_dir
+    
+    Pages are fetched and converted on a thread pool, so several requests
+    are in flight while earlier pages are being converted.
     """
-    visited = set()
-    to_visit = [start_url]
+    to_visit = deque([start_url])
+    # Every URL ever queued, so the frontier never holds duplicates
+    queued = {start_url}
     count = 0
     
     parsed_url = urllib.parse.urlparse(start_url)
     base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
     base_path = os.path.dirname(parsed_url.path)
     
-    while to_visit and count < max_pages:
-        url = to_visit.pop(0)
-        if url in visited:
-            continue
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight = set()
+        while True:
+            # Keep every worker busy while the page budget allows
+            while to_visit and len(in_flight) < workers and count < max_pages:
+                url = to_visit.popleft()
+                output_file = output_path_for(url, output_dir, base_path)
+                in_flight.add(executor.submit(markdownify_url, url, output_file, base_url))
+                count += 1
             
-        visited.add(url)
-        
-        # Determine output path
-        parsed_url = urllib.parse.urlparse(url)
-        path = parsed_url.path
-        
-        # Handle the base URL specially
-        if path.endswith('/') or path == "":
-            filename = "index"
-        else:
-            # Extract just the filename without extension
-            filename = os.path.basename(path).replace('.html', '')
-        
-        # Get the directory part relative to the base
-        dir_path = os.path.dirname(path)
-        if base_path and dir_path.startswith(base_path):
-            dir_path = dir_path[len(base_path):].lstrip('/')
-        
-        # Create the final output path
-        if dir_path:
-            rel_dir = os.path.join(output_dir, dir_path)
-            os.makedirs(rel_dir, exist_ok=True)
-            output_file = os.path.join(rel_dir, f"{filename}.md")
-        else:
-            output_file = os.path.join(output_dir, f"{filename}.md")
-        
-        # Markdownify and get new links
-        links = markdownify_url(url, output_file, base_url)
-        count += 1
-        
-        # Add new links to visit
-        for link in links:
-            if link not in visited and link.startswith(base_url):
-                to_visit.append(link)
+            if not in_flight:
+                break
+            
+            # Markdownify and get new links from whichever pages finish first
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                # Add new links to visit
+                for link in future.result():
+                    # Drop fragments so anchors within a page don't requeue it
+                    link = urllib.parse.urldefrag(link)[0]
+                    if link not in queued and link.startswith(base_url):
+                        to_visit.append(link)
+                        queued.add(link)
     
     print(f"Crawled {count} pages")
     return count
@@ -5,27 +5,43 @@ Script to markdownify a webpage and save it to a local file
 
 import os
 import sys
-import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from markdownify import markdownify as md
 import argparse
 import pathvalidate
 
-def markdownify_url(url, output_path):
+# Add the project root to the Python path so the shared helpers import when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.web import SESSION
+
+# Only build the <body> subtree; <head> (stylesheets, scripts, metadata) is
+# skipped while parsing instead of being built and then thrown away
+BODY_ONLY = SoupStrainer("body")
+
+def markdownify_url(url, output_path, session=None):
     """
     Fetch a URL, convert its HTML to Markdown, and save to output_path
+    
+    Batch callers can pass their own requests session to share its connection pool.
     """
     try:
         print(f"Fetching URL: {url}")
-        response = requests.get(url)
+        response = (session or SESSION).get(url, timeout=(5, 30), stream=True)
         response.raise_for_status()
         
         print(f"Converting to Markdown...")
-        html = response.text
-        soup = BeautifulSoup(html, features="html.parser")
+        # Hand the parser raw bytes so it detects the encoding itself instead of
+        # requests decoding the whole body to a str first
+        html = response.content
+        soup = BeautifulSoup(html, features="lxml", parse_only=BODY_ONLY)
+        if not soup.contents:
+            # Fragments without a <body> element: parse the whole document
+            soup = BeautifulSoup(html, features="lxml")
         
-        # Remove script and style elements that we don't want to convert
-        for script in soup(["script", "style"]):
+        # Strainers only filter top-level tags, so scripts and styles inside
+        # the body still have to be removed
+        for script in soup(["script", "style", "noscript", "svg"]):
             script.decompose()
             
         # Optional: Extract only main content area if known
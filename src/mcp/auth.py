@@ -13,8 +13,10 @@ The module also supports SQLite as a fallback option for development and testing
 """
 import hashlib
 import os
+import threading
 import time
 import uuid
+from collections import OrderedDict
 from contextlib import contextmanager
 from datetime import datetime, timedelta
 from functools import lru_cache
@@ -23,6 +25,7 @@ from typing import Dict, List, Optional, Tuple, Union, Any
 import sqlite3
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
 from fastapi import Depends, HTTPException, Request, Security
 from fastapi.security import APIKeyHeader
 from pydantic import BaseModel
@@ -35,6 +38,16 @@ logger = get_logger(__name__)
 # API key header
 API_KEY_HEADER = APIKeyHeader(name="X-API-Key", auto_error=False)
 
+# Maximum number of API key lookups remembered per AuthDB
+KEY_CACHE_SIZE = 10000
+
+# Unknown keys are cached only briefly so a newly created key works right away
+# even in another process
+NEGATIVE_KEY_CACHE_TTL = 5
+
+# Seconds between sweeps of expired rate limit counters
+RATE_LIMIT_PURGE_INTERVAL = 60
+
 
 class APIKey(BaseModel):
     """API key model."""
@@ -57,6 +70,11 @@ class AuthDB:
     These authentication and security concerns are kept separate from the main 
     knowledge graph data stored in ArangoDB, following the principle of using the 
     right tool for the right job.
+    
+    PostgreSQL connections come from a per-process pool sized by
+    ``config.mcp.auth.pg_pool_size``. Deployments running many server processes
+    can put PgBouncer (pool_mode = transaction) in front of PostgreSQL to cap
+    the total number of backends.
     """
     
     def __init__(self):
@@ -86,35 +104,129 @@ class AuthDB:
                 self.db_type = "sqlite"
                 self.db_path = ":memory:"
         
+        # SQLite uses one long-lived connection shared by all requests, so auth
+        # checks don't reopen the database file and re-read its schema each time
+        self._conn = None
+        self._conn_lock = threading.Lock()
+        self._pg_pool = None
+        self._pg_slots = None
+        if self.db_type == "sqlite":
+            self._conn = self._connect_sqlite()
+        else:
+            # Starting a PostgreSQL backend is expensive; reuse pooled connections
+            self._pg_pool = psycopg2.pool.ThreadedConnectionPool(
+                minconn=2,
+                maxconn=config.mcp.auth.pg_pool_size,
+                host=self.pg_config.host,
+                port=self.pg_config.port,
+                user=self.pg_config.username,
+                password=self.pg_config.password,
+                dbname=self.pg_config.database,
+                cursor_factory=psycopg2.extras.DictCursor
+            )
+            # getconn raises PoolError when every connection is checked out;
+            # the semaphore makes extra threads wait for one to be returned
+            self._pg_slots = threading.BoundedSemaphore(config.mcp.auth.pg_pool_size)
+        
+        # Validation results keyed by API key hash, as (expiry, APIKey or None)
+        # in LRU order
+        self._key_cache: "OrderedDict[str, Tuple[float, Optional[APIKey]]]" = OrderedDict()
+        self._key_cache_lock = threading.Lock()
+        
         self.init_db()
     
+    def _connect_sqlite(self) -> sqlite3.Connection:
+        """Open the shared SQLite connection and tune it for concurrent access."""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        
+        # WAL lets readers proceed while a write is in progress; NORMAL sync is
+        # safe under WAL and avoids an fsync on every commit
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+    
+    def close(self) -> None:
+        """Close the shared SQLite connection or the PostgreSQL pool."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self._pg_pool is not None:
+            self._pg_pool.closeall()
+            self._pg_pool = None
+    
     @contextmanager
     def get_connection(self):
         """Get a connection to the database (PostgreSQL or SQLite)."""
-        conn = None
-        try:
-            if self.db_type == "sqlite":
-                conn = sqlite3.connect(self.db_path)
-                conn.row_factory = sqlite3.Row
-            else:  # postgresql
-                conn = psycopg2.connect(
-                    host=self.pg_config.host,
-                    port=self.pg_config.port,
-                    user=self.pg_config.username,
-                    password=self.pg_config.password,
-                    dbname=self.pg_config.database
-                )
-                conn.cursor_factory = psycopg2.extras.DictCursor
-            yield conn
-        finally:
-            if conn:
-                conn.close()
+        if self.db_type == "sqlite":
+            # sqlite3 connections aren't safe for concurrent use, so requests
+            # take turns on the shared one
+            with self._conn_lock:
+                try:
+                    yield self._conn
+                except Exception:
+                    # Don't leave a failed transaction open on the shared connection
+                    self._conn.rollback()
+                    raise
+            return
+        
+        with self._pg_slots:
+            conn = self._pg_pool.getconn()
+            try:
+                yield conn
+            finally:
+                # The pool rolls back any transaction left open before reusing the connection
+                self._pg_pool.putconn(conn)
+    
+    def _rate_limits_needs_rebuild(self, cursor) -> bool:
+        """
+        Check whether an existing rate_limits table lacks the (key_id, window_start) key.
+        
+        CREATE TABLE IF NOT EXISTS leaves tables from older schemas untouched,
+        and the UPSERT in check_rate_limit fails without this primary key.
+        
+        Args:
+            cursor: Cursor on the auth database
+            
+        Returns:
+            True if the table exists with a different primary key
+        """
+        if self.db_type == "sqlite":
+            cursor.execute("PRAGMA table_info(rate_limits)")
+            columns = cursor.fetchall()
+            if not columns:
+                return False
+            pk_columns = {row["name"] for row in columns if row["pk"]}
+        else:  # postgresql
+            cursor.execute("SELECT to_regclass('rate_limits') IS NOT NULL")
+            if not cursor.fetchone()[0]:
+                return False
+            cursor.execute("""
+            SELECT kcu.column_name
+            FROM information_schema.table_constraints tc
+            JOIN information_schema.key_column_usage kcu
+              ON tc.constraint_name = kcu.constraint_name
+             AND tc.table_schema = kcu.table_schema
+            WHERE tc.table_name = 'rate_limits'
+              AND tc.table_schema = current_schema()
+              AND tc.constraint_type = 'PRIMARY KEY'
+            """)
+            pk_columns = {row[0] for row in cursor.fetchall()}
+        
+        return pk_columns != {"key_id", "window_start"}
     
     def init_db(self) -> None:
         """Initialize the database schema."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
+            # Rate limit rows only live for one window, so an outdated table is
+            # dropped and recreated rather than migrated
+            if self._rate_limits_needs_rebuild(cursor):
+                logger.warning("Recreating rate_limits table with (key_id, window_start) primary key")
+                cursor.execute("DROP TABLE rate_limits")
+            
             if self.db_type == "sqlite":
                 # Create API keys table for SQLite
                 cursor.execute("""
@@ -134,7 +246,8 @@ class AuthDB:
                     key_id TEXT NOT NULL,
                     requests INTEGER DEFAULT 1,
                     window_start TEXT NOT NULL,
-                    expires_at TEXT NOT NULL
+                    expires_at TEXT NOT NULL,
+                    PRIMARY KEY (key_id, window_start)
                 )
                 """)
                 
@@ -160,7 +273,8 @@ class AuthDB:
                     key_id TEXT NOT NULL,
                     requests INTEGER DEFAULT 1,
                     window_start TIMESTAMP NOT NULL,
-                    expires_at TIMESTAMP NOT NULL
+                    expires_at TIMESTAMP NOT NULL,
+                    PRIMARY KEY (key_id, window_start)
                 )
                 """)
                 
@@ -216,6 +330,10 @@ class AuthDB:
             
             conn.commit()
         
+        # Drop any cached "unknown key" result for this hash
+        with self._key_cache_lock:
+            self._key_cache.pop(key_hash, None)
+        
         return key_id, api_key
     
     def validate_api_key(self, api_key: str) -> Optional[APIKey]:
@@ -233,6 +351,43 @@ class AuthDB:
         
         key_hash = hashlib.sha256(api_key.encode()).hexdigest()
         
+        # Serve repeated validations from memory for up to key_cache_ttl seconds
+        now = time.monotonic()
+        with self._key_cache_lock:
+            entry = self._key_cache.get(key_hash)
+            if entry is not None and entry[0] > now:
+                self._key_cache.move_to_end(key_hash)
+                cached = entry[1]
+                # A cached key may have expired since it was looked up
+                if cached is not None and cached.expires_at and cached.expires_at < datetime.now():
+                    return None
+                return cached
+        
+        result = self._lookup_api_key(key_hash)
+        
+        ttl = config.mcp.auth.key_cache_ttl
+        if result is None:
+            ttl = min(ttl, NEGATIVE_KEY_CACHE_TTL)
+        with self._key_cache_lock:
+            self._key_cache[key_hash] = (now + ttl, result)
+            self._key_cache.move_to_end(key_hash)
+            
+            # Evict least recently used entries
+            while len(self._key_cache) > KEY_CACHE_SIZE:
+                self._key_cache.popitem(last=False)
+        
+        return result
+    
+    def _lookup_api_key(self, key_hash: str) -> Optional[APIKey]:
+        """
+        Look up an API key by hash in the database.
+        
+        Args:
+            key_hash: SHA-256 hex digest of the API key
+            
+        Returns:
+            APIKey object if the key exists, is active and has not expired, None otherwise
+        """
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
@@ -295,10 +450,38 @@ class AuthDB:
                 is_active=bool(row["is_active"])
             )
     
+    # Monotonic time of the last sweep of expired rate limit counters
+    _last_rate_limit_purge = 0.0
+    
+    def purge_expired_rate_limits(self) -> None:
+        """Delete rate limit counters whose window has expired."""
+        now = datetime.now()
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            if self.db_type == "sqlite":
+                cursor.execute(
+                    "DELETE FROM rate_limits WHERE expires_at < ?",
+                    (now.isoformat(),)
+                )
+            else:  # postgresql
+                cursor.execute(
+                    "DELETE FROM rate_limits WHERE expires_at < %s",
+                    (now,)
+                )
+            
+            conn.commit()
+        
+        self._last_rate_limit_purge = time.monotonic()
+    
     def check_rate_limit(self, api_key: str, rpm_limit: int = None) -> bool:
         """
         Check if a key has exceeded its rate limit.
         
+        Each key has one counter per calendar minute, incremented atomically
+        with a single UPSERT.
+        
         Args:
             api_key: The API key to check
             rpm_limit: Requests per minute limit (defaults to config value)
@@ -311,74 +494,47 @@ class AuthDB:
         if not api_key:
             return False
         
+        # Expired counters are swept periodically rather than on every request
+        if time.monotonic() - self._last_rate_limit_purge > RATE_LIMIT_PURGE_INTERVAL:
+            self.purge_expired_rate_limits()
+        
         key_hash = hashlib.sha256(api_key.encode()).hexdigest()
-        now = datetime.now()
-        window_start = now - timedelta(minutes=1)
-        expires_at = now + timedelta(minutes=5)
+        window_start = datetime.now().replace(second=0, microsecond=0)
+        expires_at = window_start + timedelta(minutes=5)
         
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
-            # Clean up expired rate limits
-            if self.db_type == "sqlite":
-                cursor.execute(
-                    "DELETE FROM rate_limits WHERE expires_at < ?",
-                    (now.isoformat(),)
-                )
-            else:  # postgresql
-                cursor.execute(
-                    "DELETE FROM rate_limits WHERE expires_at < %s",
-                    (now,)
-                )
-            
-            # Get current request count in the time window
-            if self.db_type == "sqlite":
-                cursor.execute(
-                    """
-                    SELECT SUM(requests) as total_requests
-                    FROM rate_limits
-                    WHERE key_id = ? AND window_start >= ?
-                    """,
-                    (key_hash, window_start.isoformat())
-                )
-            else:  # postgresql
-                cursor.execute(
-                    """
-                    SELECT SUM(requests) as total_requests
-                    FROM rate_limits
-                    WHERE key_id = %s AND window_start >= %s
-                    """,
-                    (key_hash, window_start)
-                )
-            
-            row = cursor.fetchone()
-            total_requests = row["total_requests"] if row and row["total_requests"] else 0
-            
-            # If we're already over the limit, deny the request
-            if total_requests >= rpm_limit:
-                return False
-            
-            # Record this request
+            # Count this request in the current minute's counter
             if self.db_type == "sqlite":
                 cursor.execute(
                     """
                     INSERT INTO rate_limits (key_id, requests, window_start, expires_at)
                     VALUES (?, 1, ?, ?)
+                    ON CONFLICT (key_id, window_start)
+                    DO UPDATE SET requests = rate_limits.requests + 1
+                    RETURNING requests
                     """,
-                    (key_hash, now.isoformat(), expires_at.isoformat())
+                    (key_hash, window_start.isoformat(), expires_at.isoformat())
                 )
             else:  # postgresql
                 cursor.execute(
                     """
                     INSERT INTO rate_limits (key_id, requests, window_start, expires_at)
                     VALUES (%s, 1, %s, %s)
+                    ON CONFLICT (key_id, window_start)
+                    DO UPDATE SET requests = rate_limits.requests + 1
+                    RETURNING requests
                     """,
-                    (key_hash, now, expires_at)
+                    (key_hash, window_start, expires_at)
                 )
             
+            row = cursor.fetchone()
             conn.commit()
             
-            return True
+            # Deny once the counter goes past the limit; rejected requests
+            # still count until the window rolls over
+            return row["requests"] <= rpm_limit
 
 
 # Global auth DB instance
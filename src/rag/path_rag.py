@@ -427,10 +427,13 @@ class PathRAG:
                 # Normalize entity key
                 entity_key = entity_key.lower().replace(" ", "_")
                 
-                # Set up entity document
+                # Set up entity document; the same document is used for the
+                # UPSERT's INSERT and UPDATE, so name_lc follows renames
+                name = item.get("name", entity_key)
                 entity_doc = {
                     "_key": entity_key,
-                    "name": item.get("name", entity_key),
+                    "name": name,
+                    "name_lc": name.lower(),
                     "description": item.get("description", ""),
                     "type": item.get("type", "concept"),
                     "domain": domain,
@@ -443,7 +446,7 @@ class PathRAG:
                 
                 # Add any extra fields from the item
                 for k, v in item.items():
-                    if k not in ["key", "id", "name", "description", "type", "domain", "metadata", "version", "confidence"]:
+                    if k not in ["key", "id", "name", "name_lc", "description", "type", "domain", "metadata", "version", "confidence"]:
                         entity_doc[k] = v
                 
                 # Construct AQL to upsert the entity
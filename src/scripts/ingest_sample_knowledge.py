@@ -196,6 +196,10 @@ def ingest_knowledge():
         # Create entity
         entity_key = entity["id"]
         
+        # Lowercased name backs the case-insensitive entity lookups in GraphCheck
+        if entity.get("name"):
+            entity["name_lc"] = entity["name"].lower()
+        
         # Check if entity already exists
         existing_entity = api.execute_query(
             f"FOR e IN entities FILTER e._key == @key RETURN e",
@@ -33,9 +33,11 @@ class AuthConfig(BaseModel):
     db_type: str = Field(default="postgresql")  # "sqlite" or "postgresql"
     db_path: str = Field(default="auth.db")  # Used only for SQLite
     pg_config: PostgreSQLConfig = Field(default_factory=PostgreSQLConfig)  # Used only for PostgreSQL
+    pg_pool_size: int = Field(default=16)  # Maximum pooled PostgreSQL connections per process; extra threads wait
     enabled: bool = Field(default=False)
     token_expiry_days: int = Field(default=30)
     rate_limit_rpm: int = Field(default=60)  # Requests per minute
+    key_cache_ttl: int = Field(default=60)  # Seconds a validated API key is cached in memory
     admin_keys: list[str] = Field(default_factory=list)  # List of admin key IDs
     
 
@@ -143,7 +145,7 @@ def load_config() -> AppConfig:
                 auth_config["enabled"] = auth_config["enabled"].lower() == "true"
             
             # Convert numeric values
-            for key in ["token_expiry_days", "rate_limit_rpm"]:
+            for key in ["token_expiry_days", "rate_limit_rpm", "pg_pool_size", "key_cache_ttl"]:
                 if key in auth_config:
                     auth_config[key] = int(auth_config[key])
             
@@ -0,0 +1,129 @@
+"""
+Embedding helpers shared by the HADES encoders.
+
+The ECL learner and GraphCheck both mean-pool transformer outputs, cache
+embeddings by text, and ship them as base64 float16 blobs; this module
+holds the one implementation of each.
+"""
+from collections import OrderedDict
+from typing import Callable, Dict, List, Sequence
+import base64
+import hashlib
+import threading
+
+import numpy as np
+import torch
+
+# Maximum number of embeddings an EmbeddingCache keeps in memory
+EMBEDDING_CACHE_SIZE = 10000
+
+
+def mean_pool(hidden: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+    """
+    Average token embeddings, ignoring padding positions.
+
+    Args:
+        hidden: Last hidden state of shape (batch, tokens, hidden_size)
+        attention_mask: Tokenizer attention mask of shape (batch, tokens)
+
+    Returns:
+        Float32 tensor of shape (batch, hidden_size); summing in float32 keeps
+        half-precision hidden states from overflowing over long inputs
+    """
+    mask = attention_mask.unsqueeze(-1).float()
+    return (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+
+
+def encode_embedding_blob(vector) -> str:
+    """
+    Encode an embedding as a base64 float16 blob for storage or JSON responses.
+
+    Args:
+        vector: Embedding vector as a NumPy array or CPU tensor
+
+    Returns:
+        Base64-encoded float16 bytes
+    """
+    return base64.b64encode(np.asarray(vector, dtype=np.float16).tobytes()).decode("ascii")
+
+
+def decode_embedding_blob(blob: str) -> np.ndarray:
+    """
+    Decode an embedding stored by encode_embedding_blob.
+
+    Args:
+        blob: Base64-encoded float16 bytes
+
+    Returns:
+        Embedding vector as a float16 array
+    """
+    return np.frombuffer(base64.b64decode(blob), dtype=np.float16)
+
+
+class EmbeddingCache:
+    """
+    Thread-safe LRU cache of text embeddings keyed by a BLAKE2b hash of the text.
+    """
+
+    def __init__(self, maxsize: int = EMBEDDING_CACHE_SIZE):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of embeddings kept before evicting the least recently used
+        """
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[bytes, torch.Tensor]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def get_or_encode(
+        self,
+        texts: Sequence[str],
+        encode: Callable[[List[str]], torch.Tensor]
+    ) -> List[torch.Tensor]:
+        """
+        Get embeddings for texts, encoding only those not already cached.
+
+        Args:
+            texts: Texts to embed
+            encode: Function encoding a list of texts into a tensor with one row per text
+
+        Returns:
+            One embedding per text, in input order
+        """
+        keys = [self._key(text) for text in texts]
+
+        # Only run the encoder on texts not already in the cache, once per distinct text
+        found: Dict[bytes, torch.Tensor] = {}
+        misses: Dict[bytes, str] = {}
+        with self._lock:
+            for key, text in zip(keys, texts):
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+                else:
+                    misses.setdefault(key, text)
+
+        if misses:
+            # Encode outside the lock so other threads can still hit the cache
+            encoded = encode(list(misses.values()))
+            for row, key in enumerate(misses):
+                # Copy the row so a cached entry doesn't keep its whole batch alive
+                found[key] = encoded[row].clone()
+
+            with self._lock:
+                for key in misses:
+                    self._entries[key] = found[key]
+
+                # Evict least recently used entries
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+        return [found[key] for key in keys]
@@ -5,7 +5,6 @@ This module handles scheduling of background tasks like:
 - Version synchronization
 - Change compaction
 - Old version cleanup
-- Incremental training data generation
 """
 import threading
 import time
@@ -14,7 +13,6 @@ from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from src.utils.logger import get_logger
 from src.utils.version_sync import version_sync
-from src.ecl.learner import ecl
 
 logger = get_logger(__name__)
 
@@ -135,19 +133,6 @@ def version_maintenance_task() -> None:
         logger.error(f"Error cleaning up old versions: {cleanup_result.get('error')}")
 
 
-def incremental_training_task() -> None:
-    """Generate incremental training data from recent changes."""
-    logger.info("Running incremental training data generation task")
-    
-    # Process unprocessed changes and generate training data
-    result = ecl.process_unprocessed_changes()
-    
-    if result.get("success", False):
-        logger.info(f"Generated training data with {result.get('training_examples', 0)} examples")
-    else:
-        logger.error(f"Error generating training data: {result.get('error')}")
-
-
 # Create a global scheduler instance and configure tasks
 scheduler = TaskScheduler()
 
@@ -159,14 +144,6 @@ scheduler.add_task(
     run_on_start=False
 )
 
-# Add incremental training task (hourly)
-scheduler.add_task(
-    name="incremental_training",
-    func=incremental_training_task,
-    interval_seconds=60 * 60,  # Hourly
-    run_on_start=True
-)
-
 
 def start_scheduler() -> None:
     """Start the task scheduler."""
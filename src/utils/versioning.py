@@ -7,6 +7,7 @@ to downstream processes like GNN training.
 """
 from typing import Any, Dict, List, Optional, Set, Tuple, Union
 from datetime import datetime, timezone
+import functools
 import uuid
 import json
 
@@ -56,9 +57,10 @@ class KGVersion:
             
         return KGVersion.generate_version_id(major, minor, patch)
     
-    @staticmethod 
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
     def parse_version(version_str: str) -> Tuple[int, int, int]:
-        """Parse a version string into its components."""
+        """Parse a version string into its components (memoized)."""
         if not version_str.startswith(KGVersion.VERSION_PREFIX):
             version_str = f"{KGVersion.VERSION_PREFIX}{version_str}"
         
@@ -89,18 +91,23 @@ class VersionMetadata:
     """Metadata fields to be added to versioned documents."""
     
     @staticmethod
-    def create_metadata(version: str, commit_id: Optional[str] = None) -> Dict[str, Any]:
+    def create_metadata(
+        version: str,
+        commit_id: Optional[str] = None,
+        timestamp: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Create version metadata for a new document.
         
         Args:
             version: Version string
             commit_id: Optional commit ID (generated if not provided)
+            timestamp: Optional ISO timestamp, so batch writers can format it once
             
         Returns:
             Dictionary with version metadata
         """
-        now = datetime.now(timezone.utc).isoformat()
+        now = timestamp or datetime.now(timezone.utc).isoformat()
         return {
             "version": version,
             "created_at": now,
@@ -166,6 +173,7 @@ class ChangeLog:
         changes: Dict[str, Any],
         commit_id: str,
         commit_message: Optional[str] = None,
+        timestamp: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         Create a change log entry.
@@ -177,6 +185,7 @@ class ChangeLog:
             changes: Dictionary containing the changes
             commit_id: Commit ID
             commit_message: Optional commit message
+            timestamp: Optional ISO timestamp, so batch writers can format it once
             
         Returns:
             Change log entry as a dictionary
@@ -187,7 +196,7 @@ class ChangeLog:
             "previous_version": previous_version,
             "new_version": new_version,
             "commit_id": commit_id,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": timestamp or datetime.now(timezone.utc).isoformat(),
             "changes": changes,
             "commit_message": commit_message or f"Updated {entity_id} to {new_version}",
         }
@@ -0,0 +1,20 @@
+"""
+HTTP and HTML helpers shared by the documentation scraping scripts.
+"""
+import re
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Link prefixes that never point at another page
+SKIP_LINK_RE = re.compile(r'^(?:#|javascript:|mailto:|tel:)')
+
+# Elements dropped before conversion: non-content tags and navigation boilerplate
+STRIP_SELECTOR = 'script, style, noscript, iframe, nav, footer, .sidebar'
+
+# Shared session so consecutive fetches reuse keep-alive connections
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=20, pool_maxsize=100, max_retries=Retry(total=3, backoff_factor=0.3))
+SESSION.mount('https://', _adapter)
+SESSION.mount('http://', _adapter)
@@ -226,7 +226,8 @@ PG_TEST_PARAMS = {{
                 key_id TEXT NOT NULL,
                 requests INTEGER DEFAULT 1,
                 window_start TIMESTAMP NOT NULL,
-                expires_at TIMESTAMP NOT NULL
+                expires_at TIMESTAMP NOT NULL,
+                PRIMARY KEY (key_id, window_start)
             )
             """)
             
@@ -92,5 +92,19 @@ class TestDataIngestion(unittest.TestCase):
             # Clean up environment variable
             os.environ["HADES_DB__SIMULATE_INGEST_ERROR"] = "false"
 
+class TestDataIngestionInsertFailure(unittest.TestCase):
+    def test_failed_insert_reports_failure(self):
+        """Test a failed batch insert is reported instead of counted as success."""
+        data_ingestion = DataIngestion.__new__(DataIngestion)
+        data_ingestion.db_connection = MagicMock()
+        data_ingestion.db_connection.execute_query.return_value = {
+            "success": False,
+            "error": "unique constraint violated"
+        }
+        
+        result = data_ingestion.ingest_data([{"name": "Alice"}], domain="People")
+        self.assertFalse(result['success'])
+        self.assertIn("unique constraint violated", result['error'])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -1,4 +1,7 @@
+import os
 import unittest
+from unittest.mock import MagicMock, patch
+from src.db import connection
 from src.db.connection import DBConnection
 
 class TestDBConnection(unittest.TestCase):
@@ -15,5 +18,79 @@ class TestDBConnection(unittest.TestCase):
         self.assertTrue(result['success'])
         self.assertIn('result', result)
 
+class TestInsertChangeLogs(unittest.TestCase):
+    def setUp(self):
+        self.db_connection = DBConnection.__new__(DBConnection)
+        self.db_connection.arango_db = MagicMock()
+        self.import_bulk = self.db_connection.arango_db.collection.return_value.import_bulk
+
+    def test_entries_sent_through_bulk_import(self):
+        entries = [{"_key": str(i), "entity_id": "entities/1"} for i in range(3)]
+        self.import_bulk.return_value = [{"created": 2, "errors": 0}, {"created": 1, "errors": 0}]
+
+        result = self.db_connection.insert_change_logs(entries)
+
+        self.db_connection.arango_db.collection.assert_called_once_with("change_logs")
+        self.import_bulk.assert_called_once_with(
+            entries, on_duplicate="error", batch_size=2000, sync=False
+        )
+        self.assertEqual(result, {"success": True, "created": 3, "errors": 0})
+
+    def test_import_errors_are_reported(self):
+        self.import_bulk.return_value = {"created": 0, "errors": 1}
+
+        result = self.db_connection.insert_change_logs([{"_key": "dup"}])
+
+        self.assertFalse(result["success"])
+        self.assertEqual(result["errors"], 1)
+
+    def test_no_entries_skips_request(self):
+        result = self.db_connection.insert_change_logs([])
+
+        self.import_bulk.assert_not_called()
+        self.assertEqual(result, {"success": True, "created": 0})
+
+class TestExecuteArangoQueryOptions(unittest.TestCase):
+    def setUp(self):
+        self.db_connection = DBConnection.__new__(DBConnection)
+        self.db_connection.arango_db = MagicMock()
+        self.db_connection.arango_client = MagicMock()
+        self.db_connection.arango_host = "http://localhost:8529"
+        self.execute = self.db_connection.arango_db.aql.execute
+
+    def test_unset_options_are_not_sent(self):
+        self.execute.return_value = iter([{"_key": "1"}])
+
+        result = self.db_connection.execute_arango_query("FOR d IN domains RETURN d")
+
+        self.assertEqual(self.execute.call_args[1], {"bind_vars": {}, "stream": False})
+        self.assertEqual(result["result"], [{"_key": "1"}])
+
+    def test_streaming_returns_unread_cursor(self):
+        cursor = MagicMock()
+        self.execute.return_value = cursor
+
+        result = self.db_connection.execute_arango_query(
+            "FOR d IN domains RETURN d", stream=True, batch_size=100, cache=False
+        )
+
+        self.assertEqual(
+            self.execute.call_args[1],
+            {"bind_vars": {}, "stream": True, "batch_size": 100, "cache": False}
+        )
+        self.assertIs(result["result"], cursor)
+        cursor.__iter__.assert_not_called()
+
+class TestLoadEnv(unittest.TestCase):
+    def test_env_file_read_once_without_marking_environment(self):
+        with patch.object(connection, "_ENV_LOADED", False), \
+                patch.object(connection, "load_dotenv") as load_dotenv:
+            connection.load_env("/tmp/hades.env")
+            connection.load_env("/tmp/hades.env")
+
+        load_dotenv.assert_called_once_with("/tmp/hades.env")
+        # Child processes must still load the file themselves
+        self.assertNotIn("HADES_ENV_LOADED", os.environ)
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,6 +1,9 @@
+import numpy as np
 import pytest
+from unittest.mock import MagicMock, patch
 from src.ecl.continual_learner import ExternalContinualLearner
 from src.db.connection import DBConnection
+from src.utils.embeddings import decode_embedding_blob
 
 @pytest.fixture(scope="module")
 def db_connection():
@@ -14,4 +17,44 @@ def continual_learner(db_connection):
 
 def test_initialization(continual_learner):
     assert isinstance(continual_learner, ExternalContinualLearner)
-    assert continual_learner.db is not None
\ No newline at end of file
+    assert continual_learner.db is not None
+
+def test_store_embeddings_uses_existing_domain_key():
+    db = MagicMock()
+    with patch("src.ecl.continual_learner.ChangeLog"):
+        learner = ExternalContinualLearner(db)
+    
+    # Domains created before domain_key() existed keep their original key
+    domain = {"_key": "12345", "name": "Machine Learning", "entities": [{"_id": "entities/1"}]}
+    learner._refresh_domain_embeddings(domain)
+    
+    stored = db.collection.return_value.update.call_args[0][0]
+    assert stored["_key"] == "12345"
+
+def test_get_domain_falls_back_to_name_lookup():
+    db = MagicMock()
+    db.aql.execute.return_value = iter([{"_key": "12345", "name": "a/b", "entities": []}])
+    with patch("src.ecl.continual_learner.ChangeLog"):
+        learner = ExternalContinualLearner(db)
+    
+    domain = learner._get_domain("a/b")
+    
+    # The key lookup is only trusted when the stored name matches; otherwise
+    # the query falls back to a filter on the name
+    query, kwargs = db.aql.execute.call_args[0][0], db.aql.execute.call_args[1]
+    assert "FILTER x.name == @name" in query
+    assert kwargs["bind_vars"] == {"domain_key": "a_b", "name": "a/b"}
+    assert domain["_key"] == "12345"
+
+def test_store_embeddings_uses_shared_blob_format():
+    db = MagicMock()
+    with patch("src.ecl.continual_learner.ChangeLog"):
+        learner = ExternalContinualLearner(db)
+    
+    embeddings = np.array([0.5, -1.25, 3.0], dtype=np.float32)
+    learner._store_domain_embeddings("Machine Learning", embeddings, key="12345")
+    
+    stored = db.collection.return_value.update.call_args[0][0]
+    assert stored["embedding_dtype"] == "fp16"
+    assert stored["embedding_dim"] == 3
+    assert np.array_equal(decode_embedding_blob(stored["embedding_blob"]), embeddings.astype(np.float16))
@@ -15,12 +15,14 @@ class TestExternalContinualLearner(unittest.TestCase):
         self.assertIn('domain', result)
         self.assertIn('updated_count', result)
 
-    def test_generate_embedding(self):
-        document = {"id": "doc1", "text": "This is a test document"}
-        embedding = self.learner._generate_embedding(document)
-        self.assertIsNotNone(embedding)
-        self.assertIn('document_id', embedding)
-        self.assertIn('embedding_vector', embedding)
+    def test_generate_embeddings_batch(self):
+        documents = [
+            {"id": "doc1", "text": "This is a test document"},
+            {"id": "doc2", "text": "A second, somewhat longer test document"}
+        ]
+        embeddings = self.learner._generate_embeddings_batch(documents)
+        self.assertEqual(embeddings.shape[0], len(documents))
+        self.assertEqual(embeddings.shape[1], self.learner.model.config.hidden_size)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
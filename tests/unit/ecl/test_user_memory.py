@@ -0,0 +1,100 @@
+import hashlib
+
+import orjson
+
+from src.ecl import user_memory
+from src.ecl.user_memory import COUNTER_BYTES, MESSAGE_COUNT_FILE, UserMemoryManager
+
+API_KEY = "test-api-key"
+
+
+def _legacy_conversation(manager, message_count):
+    """Create a conversation in the layout used before the counter file existed"""
+    conv_path = manager.get_user_directory(API_KEY) / "conversations" / "conv_legacy"
+    (conv_path / "raw").mkdir(parents=True)
+    (conv_path / "metadata").mkdir()
+    (conv_path / "raw" / "messages.jsonl").touch()
+    (conv_path / "metadata" / "context.json").write_bytes(orjson.dumps({
+        "created_at": 1.0,
+        "last_updated": 1.0,
+        "message_count": message_count
+    }))
+    return conv_path
+
+
+def test_legacy_conversation_metadata_is_read_from_context(tmp_path):
+    manager = UserMemoryManager(tmp_path)
+    _legacy_conversation(manager, message_count=5)
+
+    metadata = manager.get_conversation_metadata(API_KEY, "conv_legacy")
+    assert metadata["message_count"] == 5
+    assert metadata["last_updated"] == 1.0
+
+
+def test_legacy_conversation_seeds_counter_file(tmp_path):
+    manager = UserMemoryManager(tmp_path)
+    conv_path = _legacy_conversation(manager, message_count=5)
+
+    assert manager.add_message_to_conversation(API_KEY, "conv_legacy", "user", "hello")
+
+    counter = (conv_path / "metadata" / MESSAGE_COUNT_FILE).read_bytes()
+    assert int.from_bytes(counter, "little") == 6
+    assert len(counter) == COUNTER_BYTES
+    metadata = manager.get_conversation_metadata(API_KEY, "conv_legacy")
+    assert metadata["message_count"] == 6
+    assert metadata["last_updated"] > 1.0
+    manager.close()
+
+
+def test_new_conversation_counts_messages(tmp_path):
+    manager = UserMemoryManager(tmp_path)
+    conversation_id = manager.create_conversation(API_KEY)
+
+    for content in ("one", "two", "three"):
+        assert manager.add_message_to_conversation(API_KEY, conversation_id, "user", content)
+
+    assert manager.get_conversation_metadata(API_KEY, conversation_id)["message_count"] == 3
+    manager.close()
+
+
+def test_legacy_user_directory_is_renamed(tmp_path):
+    manager = UserMemoryManager(tmp_path)
+    legacy_dir = manager.users_directory / hashlib.sha256(API_KEY.encode("utf-8")).hexdigest()[:16]
+    (legacy_dir / "observations").mkdir(parents=True)
+    (legacy_dir / "observations" / "obs_1.txt").write_text("kept")
+
+    user_dir = manager.get_user_directory(API_KEY)
+
+    assert user_dir.name == hashlib.blake2b(API_KEY.encode("utf-8"), digest_size=8).hexdigest()
+    assert not legacy_dir.exists()
+    assert (user_dir / "observations" / "obs_1.txt").read_text() == "kept"
+
+
+def test_message_writers_evict_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(user_memory, "MAX_OPEN_CONVERSATIONS", 2)
+    manager = UserMemoryManager(tmp_path)
+    conversation_ids = [manager.create_conversation(API_KEY) for _ in range(3)]
+
+    for conversation_id in conversation_ids:
+        manager.add_message_to_conversation(API_KEY, conversation_id, "user", "hello")
+    first_writer_path = manager.get_user_directory(API_KEY) / "conversations" / conversation_ids[0] / "raw" / "messages.jsonl"
+
+    assert len(manager._message_writers) == 2
+    assert first_writer_path not in manager._message_writers
+
+    # An evicted conversation reopens its file and keeps appending
+    manager.add_message_to_conversation(API_KEY, conversation_ids[0], "user", "again")
+    manager.close()
+    assert len(first_writer_path.read_bytes().splitlines()) == 2
+
+
+def test_open_writers_closed_at_exit(tmp_path):
+    manager = UserMemoryManager(tmp_path)
+    conversation_id = manager.create_conversation(API_KEY)
+    manager.add_message_to_conversation(API_KEY, conversation_id, "user", "hello")
+    writer = next(iter(manager._message_writers.values()))
+
+    user_memory._close_open_managers()
+
+    assert writer.closed
+    assert not manager._message_writers
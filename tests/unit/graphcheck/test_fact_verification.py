@@ -0,0 +1,85 @@
+import unittest
+from unittest.mock import MagicMock
+
+from src.graphcheck.fact_verification import Claim, GraphCheck
+
+
+class FakeCursor(list):
+    """List-backed stand-in for a python-arango cursor."""
+
+    def close(self, ignore_missing=False):
+        return True
+
+
+def _evidence(idx, subject, obj):
+    return {
+        "idx": idx,
+        "subject": {"_id": f"entities/{subject}", "name": subject, "version": "v0.0.0"},
+        "predicate": {"_id": "relationships/1", "type": "knows", "version": "v0.0.0"},
+        "object": {"_id": f"entities/{obj}", "name": obj, "version": "v0.0.0"}
+    }
+
+
+class TestFactVerification(unittest.TestCase):
+    def setUp(self):
+        self.db = MagicMock()
+        self.graph_check = GraphCheck(db_connection=self.db)
+
+    def test_duplicate_claims_share_one_lookup(self):
+        self.db.aql.execute.side_effect = lambda *args, **kwargs: FakeCursor([_evidence(0, "Alice", "Bob")])
+        claims = [
+            Claim(text="Alice knows Bob", subject="Alice", predicate="knows", object="Bob"),
+            Claim(text="alice knows bob", subject="alice", predicate="knows", object="bob")
+        ]
+
+        results = self.graph_check.verify_claims(claims)
+
+        sent = self.db.aql.execute.call_args[1]["bind_vars"]["claims"]
+        self.assertEqual(sent, [{"idx": 0, "subject": "alice", "object": "bob"}])
+        self.assertTrue(all(result["is_verified"] for result in results))
+        self.assertEqual(results[0]["confidence"], 1.0)
+        self.assertAlmostEqual(results[1]["confidence"], 0.64)
+
+    def test_claim_without_evidence_is_unverified(self):
+        self.db.aql.execute.side_effect = lambda *args, **kwargs: FakeCursor([_evidence(1, "Bob", "Carol")])
+        claims = [
+            Claim(text="Alice knows Dave", subject="Alice", predicate="knows", object="Dave"),
+            Claim(text="Bob knows Carol", subject="Bob", predicate="knows", object="Carol"),
+            Claim(text="knows Carol", subject="", predicate="knows", object="Carol")
+        ]
+
+        results = self.graph_check.verify_claims(claims)
+
+        # Claims missing a subject or object never reach the database
+        self.assertEqual(len(self.db.aql.execute.call_args[1]["bind_vars"]["claims"]), 2)
+        self.assertEqual([result["is_verified"] for result in results], [False, True, False])
+        self.assertIsNone(results[0]["evidence"])
+        self.assertEqual(results[0]["confidence"], 0.0)
+        self.assertNotIn("idx", results[1]["evidence"])
+
+    def test_only_pinned_lookups_are_cached(self):
+        self.db.aql.execute.side_effect = lambda *args, **kwargs: FakeCursor([_evidence(0, "Alice", "Bob")])
+        claims = [Claim(text="Alice knows Bob", subject="Alice", predicate="knows", object="Bob")]
+
+        self.graph_check.verify_claims(claims, as_of_timestamp="2025-01-01T00:00:00")
+        cached = self.graph_check.verify_claims(claims, as_of_timestamp="2025-01-01T00:00:00")
+        self.assertEqual(self.db.aql.execute.call_count, 1)
+        self.assertTrue(cached[0]["is_verified"])
+
+        # Current-state lookups always query the graph
+        self.graph_check.verify_claims(claims)
+        self.graph_check.verify_claims(claims)
+        self.assertEqual(self.db.aql.execute.call_count, 3)
+
+    def test_verify_text_streams_batches(self):
+        self.db.aql.execute.side_effect = lambda *args, **kwargs: FakeCursor([])
+        text = "Alice knows Bob well. Bob knows Carol well. Carol knows Dave well."
+
+        results = list(self.graph_check.verify_text(text, batch_size=2))
+
+        self.assertEqual(self.db.aql.execute.call_count, 2)
+        self.assertEqual([result["subject"] for result in results], ["Alice", "Bob", "Carol"])
+
+
+if __name__ == '__main__':
+    unittest.main()
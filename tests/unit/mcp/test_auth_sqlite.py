@@ -8,6 +8,8 @@ import pytest
 import uuid
 import hashlib
 import sqlite3
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from contextlib import contextmanager
 
@@ -42,15 +44,16 @@ class TestAuthDBSQLite:
         
         cursor.execute("""
         CREATE TABLE rate_limits (
-            key TEXT NOT NULL,
+            key_id TEXT NOT NULL,
             requests INTEGER DEFAULT 1,
             window_start TEXT NOT NULL,
-            expires_at TEXT NOT NULL
+            expires_at TEXT NOT NULL,
+            PRIMARY KEY (key_id, window_start)
         )
         """)
         
         # Add indexes
-        cursor.execute("CREATE INDEX idx_rate_limits_key ON rate_limits(key)")
+        cursor.execute("CREATE INDEX idx_rate_limits_key_id ON rate_limits(key_id)")
         cursor.execute("CREATE INDEX idx_rate_limits_expires ON rate_limits(expires_at)")
         
         self.conn.commit()
@@ -61,6 +64,8 @@ class TestAuthDBSQLite:
                 self.db_type = "sqlite"
                 self.db_path = ":memory:"
                 self.conn = conn
+                self._key_cache = OrderedDict()
+                self._key_cache_lock = threading.Lock()
             
             @contextmanager
             def get_connection(self):
@@ -166,9 +171,33 @@ class TestAuthDBSQLite:
         
         # Verify rate limit records in the database
         cursor = self.conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM rate_limits")
-        count = cursor.fetchone()[0]
-        assert count == 5  # 5 requests recorded
+        cursor.execute("SELECT SUM(requests) FROM rate_limits")
+        total = cursor.fetchone()[0]
+        assert total == 6  # 5 allowed requests plus the rejected one, in per-minute counters
+
+    def test_init_db_rebuilds_legacy_rate_limits(self):
+        """Test init_db replaces a rate_limits table without the window primary key."""
+        cursor = self.conn.cursor()
+        cursor.execute("DROP TABLE rate_limits")
+        cursor.execute("""
+        CREATE TABLE rate_limits (
+            key_id TEXT NOT NULL,
+            requests INTEGER DEFAULT 1,
+            window_start TEXT NOT NULL,
+            expires_at TEXT NOT NULL
+        )
+        """)
+        self.conn.commit()
+
+        self.auth_db.init_db()
+
+        cursor.execute("PRAGMA table_info(rate_limits)")
+        pk_columns = {row["name"] for row in cursor.fetchall() if row["pk"]}
+        assert pk_columns == {"key_id", "window_start"}
+
+        # The UPSERT needs the primary key to resolve conflicts
+        key_id, api_key = self.auth_db.create_api_key("migrated_key")
+        assert self.auth_db.check_rate_limit(api_key, rpm_limit=5) is True
 
 
 @pytest.mark.asyncio
@@ -197,15 +226,16 @@ class TestAuthDependencies:
         
         cursor.execute("""
         CREATE TABLE rate_limits (
-            key TEXT NOT NULL,
+            key_id TEXT NOT NULL,
             requests INTEGER DEFAULT 1,
             window_start TEXT NOT NULL,
-            expires_at TEXT NOT NULL
+            expires_at TEXT NOT NULL,
+            PRIMARY KEY (key_id, window_start)
         )
         """)
         
         # Add indexes
-        cursor.execute("CREATE INDEX idx_rate_limits_key ON rate_limits(key)")
+        cursor.execute("CREATE INDEX idx_rate_limits_key_id ON rate_limits(key_id)")
         cursor.execute("CREATE INDEX idx_rate_limits_expires ON rate_limits(expires_at)")
         
         # Create a valid API key for testing
@@ -228,6 +258,8 @@ class TestAuthDependencies:
                 self.db_type = "sqlite"
                 self.db_path = ":memory:"
                 self._conn = conn
+                self._key_cache = OrderedDict()
+                self._key_cache_lock = threading.Lock()
             
             @contextmanager
             def get_connection(self):
@@ -27,6 +27,8 @@ class TestConfig:
         assert auth_config.enabled is False
         assert auth_config.token_expiry_days == 30
         assert auth_config.rate_limit_rpm == 60
+        assert auth_config.pg_pool_size == 16
+        assert auth_config.key_cache_ttl == 60
         assert auth_config.admin_keys == []
         
         # Test MCPConfig defaults
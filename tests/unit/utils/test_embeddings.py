@@ -0,0 +1,60 @@
+"""
+Unit tests for the shared embedding helpers.
+"""
+from unittest.mock import MagicMock
+
+import numpy as np
+import torch
+
+from src.utils.embeddings import (
+    EmbeddingCache,
+    decode_embedding_blob,
+    encode_embedding_blob,
+    mean_pool,
+)
+
+
+class TestEmbeddings:
+    """Tests for the embedding helpers."""
+
+    def test_mean_pool_ignores_padding(self):
+        """Test padded positions don't contribute to the pooled embedding."""
+        hidden = torch.tensor([[[1.0, 2.0], [3.0, 4.0], [100.0, 100.0]]], dtype=torch.float16)
+        mask = torch.tensor([[1, 1, 0]])
+        pooled = mean_pool(hidden, mask)
+        assert pooled.dtype == torch.float32
+        assert torch.equal(pooled, torch.tensor([[2.0, 3.0]]))
+
+    def test_blob_round_trip(self):
+        """Test embeddings survive encoding to a float16 blob and back."""
+        vector = torch.tensor([0.5, -1.25, 3.0])
+        decoded = decode_embedding_blob(encode_embedding_blob(vector))
+        assert decoded.dtype == np.float16
+        assert np.array_equal(decoded, np.array([0.5, -1.25, 3.0], dtype=np.float16))
+
+    def test_cache_encodes_each_distinct_text_once(self):
+        """Test repeated and previously seen texts are served from the cache."""
+        cache = EmbeddingCache()
+        encode = MagicMock(side_effect=lambda texts: torch.arange(len(texts)).float().unsqueeze(1))
+
+        first = cache.get_or_encode(["a", "b", "a"], encode)
+        second = cache.get_or_encode(["b", "c"], encode)
+
+        assert encode.call_args_list[0].args == (["a", "b"],)
+        assert encode.call_args_list[1].args == (["c"],)
+        assert torch.equal(first[0], first[2])
+        assert torch.equal(second[0], first[1])
+
+    def test_cache_evicts_least_recently_used(self):
+        """Test the cache stays within maxsize, dropping the oldest entry."""
+        cache = EmbeddingCache(maxsize=2)
+        encode = MagicMock(side_effect=lambda texts: torch.zeros(len(texts), 1))
+
+        cache.get_or_encode(["a", "b"], encode)
+        cache.get_or_encode(["a"], encode)
+        cache.get_or_encode(["c"], encode)
+        assert len(cache) == 2
+
+        encode.reset_mock()
+        cache.get_or_encode(["a", "b"], encode)
+        encode.assert_called_once_with(["b"])